@@ -1,5 +1,7 @@
 """Shared constants and utilities for the unhook package."""
 
+import httpx
+
 # Bluesky record types
 BSKY_POST_TYPE = "app.bsky.feed.post"
 BSKY_REPOST_TYPE = "app.bsky.feed.repost"
@@ -13,6 +15,10 @@ BSKY_EMBED_RECORD_VIEW_BLOCKED = "app.bsky.embed.record#viewBlocked"
 BSKY_EMBED_RECORD_VIEW_NOT_FOUND = "app.bsky.embed.record#viewNotFound"
 BSKY_EMBED_RECORD_VIEW_DETACHED = "app.bsky.embed.record#viewDetached"
 
+# Image downloads, shared by the Bluesky and Gmail exporters
+MAX_CONCURRENT_DOWNLOADS = 16
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
 
 def get_type_field(obj: dict) -> str:
     """Return the $type or py_type field from an object.
@@ -9,15 +9,20 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from unhook.gmail_service import RawEmail
 
 logger = logging.getLogger(__name__)
 
-# Regex to find external image URLs in HTML
-_IMG_SRC_PATTERN = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
-
-# Regex to find cid: references in HTML (inline images)
-_CID_PATTERN = re.compile(r'src=["\']cid:([^"\']+)["\']', re.IGNORECASE)
+# Regex to find image references in HTML, capturing either a cid: content ID
+# (inline image) or an http(s) URL (external image) in a single scan.
+_IMG_REF_PATTERN = re.compile(
+    r"(?P<prefix><img\b[^>]*?\ssrc=)(?P<quote>[\"'])"
+    r"(?:cid:(?P<cid>[^\"']+)|(?P<url>https?://[^\"']+))"
+    r"(?P=quote)",
+    re.IGNORECASE,
+)
 
 # Regex to match <img> tags, correctly handling ">" inside quoted attributes.
 # It alternates between unquoted text (no >, ", ') and quoted strings.
@@ -31,8 +36,13 @@ _REMOTE_SRC_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
+# Translation table for escaping plain-text bodies in a single pass
+_HTML_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+)
+
 
-@dataclass
+@dataclass(slots=True)
 class EmailContent:
     """Processed email content ready for EPUB creation."""
 
@@ -82,12 +92,7 @@ def parse_raw_email(raw: RawEmail) -> EmailContent | None:
 
 def _escape_html(text: str) -> str:
     """Escape HTML special characters."""
-    return (
-        text.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-    )
+    return text.translate(_HTML_ESCAPE_TABLE)
 
 
 def _extract_external_image_urls(html: str) -> list[str]:
@@ -95,12 +100,31 @@ def _extract_external_image_urls(html: str) -> list[str]:
 
     Only extracts http/https URLs, not cid: or data: URLs.
     """
-    urls: list[str] = []
-    for match in _IMG_SRC_PATTERN.finditer(html):
-        src = match.group(1)
-        if src.startswith(("http://", "https://")):
-            urls.append(src)
-    return urls
+    return [
+        match.group("url")
+        for match in _IMG_REF_PATTERN.finditer(html)
+        if match.group("url")
+    ]
+
+
+def _image_ref_replacer(
+    cid_to_filename: dict[str, str],
+    url_to_filename: dict[str, str],
+) -> Callable[[re.Match], str]:
+    """Build the ``_IMG_REF_PATTERN`` substitution for the given mappings."""
+
+    def replace_ref(match: re.Match) -> str:
+        cid = match.group("cid")
+        if cid is not None:
+            filename = cid_to_filename.get(cid)
+        else:
+            filename = url_to_filename.get(match.group("url"))
+        if filename:
+            return f'{match.group("prefix")}"{filename}"'
+        # Keep original if no mapping found
+        return match.group(0)
+
+    return replace_ref
 
 
 def replace_cid_references(html: str, cid_to_filename: dict[str, str]) -> str:
@@ -113,16 +137,9 @@ def replace_cid_references(html: str, cid_to_filename: dict[str, str]) -> str:
     Returns:
         HTML with cid: replaced by local filenames.
     """
-
-    def replace_cid(match: re.Match) -> str:
-        cid = match.group(1)
-        filename = cid_to_filename.get(cid)
-        if filename:
-            return f'src="{filename}"'
-        # Keep original if no mapping found
-        return match.group(0)
-
-    return _CID_PATTERN.sub(replace_cid, html)
+    if not cid_to_filename:
+        return html
+    return _IMG_REF_PATTERN.sub(_image_ref_replacer(cid_to_filename, {}), html)
 
 
 def replace_external_image_urls(html: str, url_to_filename: dict[str, str]) -> str:
@@ -135,9 +152,9 @@ def replace_external_image_urls(html: str, url_to_filename: dict[str, str]) -> s
     Returns:
         HTML with external URLs replaced by local filenames.
     """
-    for url, filename in url_to_filename.items():
-        html = html.replace(url, filename)
-    return html
+    if not url_to_filename:
+        return html
+    return _IMG_REF_PATTERN.sub(_image_ref_replacer({}, url_to_filename), html)
 
 
 def strip_remote_image_tags(html: str) -> str:
@@ -147,18 +164,48 @@ def strip_remote_image_tags(html: str) -> str:
     fail and replacement did not occur. Kindle ingestion can reject EPUBs that
     embed remote image sources in content documents.
     """
+    return localize_image_tags(html, {}, {})
+
+
+def localize_image_tags(
+    html: str,
+    cid_to_filename: dict[str, str],
+    url_to_filename: dict[str, str],
+) -> str:
+    """Point ``<img>`` tags at local files and drop those left remote.
+
+    Equivalent to :func:`replace_cid_references` and
+    :func:`replace_external_image_urls` followed by
+    :func:`strip_remote_image_tags`, but walks the document's image tags once.
+
+    Args:
+        html: HTML content with image references.
+        cid_to_filename: Mapping from content ID to EPUB filename.
+        url_to_filename: Mapping from URL to EPUB filename.
+
+    Returns:
+        HTML whose image tags reference only local (or non-remote) sources.
+    """
+    replace_ref = (
+        _image_ref_replacer(cid_to_filename, url_to_filename)
+        if cid_to_filename or url_to_filename
+        else None
+    )
 
-    def _remove_if_remote(match: re.Match) -> str:
+    def _localize(match: re.Match) -> str:
         tag = match.group(0)
+        if replace_ref is not None:
+            tag = _IMG_REF_PATTERN.sub(replace_ref, tag)
         if _REMOTE_SRC_PATTERN.search(tag):
             return ""
         return tag
 
-    return _IMG_TAG_PATTERN.sub(_remove_if_remote, html)
+    return _IMG_TAG_PATTERN.sub(_localize, html)
 
 
 __all__ = [
     "EmailContent",
+    "localize_image_tags",
     "parse_raw_email",
     "replace_cid_references",
     "replace_external_image_urls",
@@ -2,28 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import mimetypes
 from collections.abc import Iterable
 from datetime import datetime
-from io import BytesIO
 from pathlib import Path
 
 import httpx
-from PIL import Image, UnidentifiedImageError
-
-from unhook.constants import BSKY_REASON_REPOST, BSKY_REPOST_TYPE, get_type_field
-from unhook.epub_builder import EpubBuilder
+from PIL import UnidentifiedImageError
+
+from unhook.constants import (
+    BSKY_REASON_REPOST,
+    BSKY_REPOST_TYPE,
+    HTTP_LIMITS,
+    MAX_CONCURRENT_DOWNLOADS,
+    get_type_field,
+)
+from unhook.epub_builder import (
+    _COMPRESS_EXECUTOR,
+    EpubBuilder,
+    compress_image,
+    render_post_bodies,
+)
 from unhook.feed import (
     consolidate_threads_to_posts,
     fetch_feed_posts,
     find_self_threads,
 )
-from unhook.post_content import PostContent, dedupe_posts, map_posts_to_content
+from unhook.post_content import (
+    PostContent,
+    dedupe_and_map,
+    dedupe_posts,
+    map_posts_to_content,
+)
 
 logger = logging.getLogger(__name__)
-MAX_IMAGE_DIMENSION = 1200
-JPEG_QUALITY = 65
+# Most e-reader screens are 800-1000px on the short side; larger images only add
+# encode time and file size.
+MAX_IMAGE_DIMENSION = 1000
+
+# Shared read-only fallback for missing nested dicts; never mutate.
+_EMPTY: dict = {}
 
 
 async def _download_image(client: httpx.AsyncClient, url: str) -> bytes | None:
@@ -42,24 +61,7 @@ def _compress_image(content: bytes, media_type: str | None) -> tuple[bytes, str]
     The output is always in an EPUB-compatible format (JPEG or PNG).
     """
     try:
-        with Image.open(BytesIO(content)) as image:
-            image.load()
-            if image.width > MAX_IMAGE_DIMENSION or image.height > MAX_IMAGE_DIMENSION:
-                image.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
-
-            output = BytesIO()
-            has_transparency = image.mode in {"RGBA", "LA"} or (
-                "transparency" in image.info
-            )
-
-            if has_transparency:
-                image.save(output, format="PNG", optimize=True)
-                return output.getvalue(), "image/png"
-
-            image.convert("RGB").save(
-                output, format="JPEG", quality=JPEG_QUALITY, optimize=True
-            )
-            return output.getvalue(), "image/jpeg"
+        return compress_image(content, MAX_IMAGE_DIMENSION)
     except (UnidentifiedImageError, OSError) as exc:  # pragma: no cover - logging only
         logger.warning("Failed to compress image: %s", exc)
     except Exception as exc:  # pragma: no cover - logging only
@@ -68,16 +70,40 @@ def _compress_image(content: bytes, media_type: str | None) -> tuple[bytes, str]
     return content, media_type or "image/jpeg"
 
 
-async def download_images(urls: list[str]) -> dict[str, tuple[bytes, str]]:
-    """Download images and return mapping of URL to ``(bytes, media_type)``."""
+async def download_images(
+    urls: list[str], client: httpx.AsyncClient | None = None
+) -> dict[str, tuple[bytes, str]]:
+    """Download images and return mapping of URL to ``(bytes, media_type)``.
+
+    Each distinct URL is downloaded once; empty entries are skipped.
+    Pass a long-lived ``client`` to reuse its connection pool across calls; it
+    is left open. Otherwise a client is created and closed for this call.
+    """
 
     results: dict[str, tuple[bytes, str]] = {}
-    async with httpx.AsyncClient() as client:
-        for url in {u for u in urls if u}:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+    async def fetch(client: httpx.AsyncClient, url: str) -> None:
+        async with semaphore:
             content = await _download_image(client, url)
-            if content:
-                media_type, _ = mimetypes.guess_type(url)
-                results[url] = _compress_image(content, media_type)
+        if content:
+            # Pillow detects the format from the bytes; no need to guess from the URL
+            results[url] = await loop.run_in_executor(
+                _COMPRESS_EXECUTOR, _compress_image, content, None
+            )
+
+    async def fetch_all(client: httpx.AsyncClient) -> None:
+        async with asyncio.TaskGroup() as group:
+            for url in dict.fromkeys(urls):
+                if url:
+                    group.create_task(fetch(client, url))
+
+    if client is not None:
+        await fetch_all(client)
+    else:
+        async with httpx.AsyncClient(limits=HTTP_LIMITS) as owned_client:
+            await fetch_all(owned_client)
     return results
 
 
@@ -87,20 +113,33 @@ async def export_recent_posts_to_epub(
     file_prefix: str = "posts",
     min_length: int = 100,
     repost_min_length: int = 300,
+    client: httpx.AsyncClient | None = None,
 ) -> Path:
-    """Fetch posts, download assets, and build an EPUB file."""
+    """Fetch posts, download assets, and build an EPUB file.
+
+    ``client`` is an optional shared HTTP client for image downloads.
+    """
 
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
     all_posts = fetch_feed_posts(limit=limit)
 
-    # Split into native posts and reposts
-    native_posts = [p for p in all_posts if not _is_repost(p)]
-    reposts = [p for p in all_posts if _is_repost(p)]
+    # Split into native posts and reposts, collecting top-level native posts in
+    # the same pass
+    native_posts: list[dict] = []
+    top_level_native: list[dict] = []
+    reposts: list[dict] = []
+    for post in all_posts:
+        record = (post.get("post") or _EMPTY).get("record") or _EMPTY
+        if _is_repost(post, record):
+            reposts.append(post)
+            continue
+        native_posts.append(post)
+        if record.get("reply") is None:
+            top_level_native.append(post)
 
-    # Process native posts: filter top-level and find threads
-    top_level_native = _filter_top_level_posts(native_posts)
+    # Process native posts: find threads
     native_threads = find_self_threads(native_posts)
     consolidated_native = consolidate_threads_to_posts(native_threads)
     native_thread_roots = {
@@ -134,7 +173,7 @@ async def export_recent_posts_to_epub(
 
     # Convert to content
     native_content = _filter_by_length(
-        map_posts_to_content(dedupe_posts(merged_native)), min_length=min_length
+        dedupe_and_map(merged_native), min_length=min_length
     )
 
     # For reposts (standalone + consolidated threads)
@@ -148,14 +187,23 @@ async def export_recent_posts_to_epub(
     content_posts = native_content + repost_content
     content_posts = sorted(content_posts, key=lambda post: post.published, reverse=True)
 
+    # Download images while the CPU-bound markdown rendering runs in a thread
     image_urls = [url for post in content_posts for url in post.image_urls]
-    images = await download_images(image_urls) if image_urls else {}
+    # The group cancels the downloads if rendering fails, and vice versa.
+    images_task = None
+    async with asyncio.TaskGroup() as group:
+        if image_urls:
+            images_task = group.create_task(download_images(image_urls, client=client))
+        body_htmls = await asyncio.to_thread(
+            render_post_bodies, [post.body for post in content_posts]
+        )
+    images = images_task.result() if images_task else {}
 
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     output_path = output_dir / f"{file_prefix}-{timestamp}.epub"
 
     builder = EpubBuilder(title="Recent posts")
-    builder.build(content_posts, images, output_path)
+    builder.build(content_posts, images, output_path, body_htmls=body_htmls)
 
     logger.info("EPUB created at %s", output_path)
     return output_path
@@ -170,8 +218,8 @@ def _filter_top_level_posts(posts: Iterable[dict]) -> list[dict]:
     filtered: list[dict] = []
 
     for post in posts:
-        record = post.get("post", {}).get("record", {})
-        if _is_repost(post):
+        record = (post.get("post") or _EMPTY).get("record") or _EMPTY
+        if _is_repost(post, record):
             continue
         if record.get("reply") is not None:
             continue
@@ -181,23 +229,22 @@ def _filter_top_level_posts(posts: Iterable[dict]) -> list[dict]:
     return filtered
 
 
-def _is_repost(post: dict) -> bool:
-    """Return ``True`` when a feed item is a repost/retweet equivalent."""
+def _is_repost(post: dict, record: dict | None = None) -> bool:
+    """Return ``True`` when a feed item is a repost/retweet equivalent.
 
-    reason = post.get("reason")
-    if not isinstance(reason, dict):
-        reason = {}
+    ``record`` may be passed when the caller has already looked it up.
+    """
 
-    reason_type = get_type_field(reason)
-    if BSKY_REASON_REPOST in reason_type:
+    reason = post.get("reason")
+    if isinstance(reason, dict) and BSKY_REASON_REPOST in get_type_field(reason):
         return True
 
-    record = post.get("post", {}).get("record", {})
+    if record is None:
+        record = (post.get("post") or _EMPTY).get("record")
     if not isinstance(record, dict):
         return False
 
-    record_type = get_type_field(record)
-    return record_type == BSKY_REPOST_TYPE
+    return get_type_field(record) == BSKY_REPOST_TYPE
 
 
 def _filter_by_length(
@@ -227,7 +274,7 @@ def _build_repost_info(reposts: list[dict]) -> dict[str, str]:
 
     info: dict[str, str] = {}
     for post in reposts:
-        uri = post.get("post", {}).get("uri")
+        uri = (post.get("post") or _EMPTY).get("uri")
         reposter = _get_reposter_handle(post)
         if uri and reposter:
             info[uri] = reposter
@@ -239,18 +286,18 @@ def _map_reposts_to_content(
 ) -> list[PostContent]:
     """Convert repost feed responses into PostContent with reposted_by set."""
 
-    content_list = map_posts_to_content(posts)
+    # Materialize once so a generator isn't exhausted before the zip below
+    posts_list = list(posts)
+    content_list = map_posts_to_content(posts_list)
 
     # Match content back to repost info using URI patterns
-    posts_list = list(posts)
-    for idx, content in enumerate(content_list):
-        if idx < len(posts_list):
-            post = posts_list[idx]
-            uri = post.get("post", {}).get("uri", "")
-            # For consolidated threads, URI ends with #thread
-            base_uri = uri.replace("#thread", "") if uri.endswith("#thread") else uri
-            reposter = repost_info.get(uri) or repost_info.get(base_uri)
-            if reposter:
-                content.reposted_by = reposter
+    for post, content in zip(posts_list, content_list):
+        uri = (post.get("post") or _EMPTY).get("uri") or ""
+        reposter = repost_info.get(uri)
+        # For consolidated threads, URI ends with #thread
+        if not reposter and uri.endswith("#thread"):
+            reposter = repost_info.get(uri.removesuffix("#thread"))
+        if reposter:
+            content.reposted_by = reposter
 
     return content_list
@@ -1,16 +1,73 @@
 """Bluesky feed fetching functionality."""
 
+import json
 import os
+from collections import Counter
 from datetime import UTC, date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 
 from atproto import Client
 from dotenv import load_dotenv
 
+# Where the atproto session (access/refresh tokens) is cached between runs so
+# repeated fetches skip the password login. Set to None to disable caching.
+SESSION_CACHE_PATH: Path | None = (
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "unhook"
+    / "bsky_session.json"
+)
 
-def _get_author_identifier(post: dict) -> str | None:
-    """Return a stable author identifier for a feed post."""
 
-    author = post.get("post", {}).get("author", {})
+def _load_session(handle: str) -> str | None:
+    """Return the cached session string for ``handle``, if any."""
+
+    if SESSION_CACHE_PATH is None:
+        return None
+    try:
+        cached = json.loads(SESSION_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("handle") != handle:
+        return None
+    session = cached.get("session")
+    return session if isinstance(session, str) else None
+
+
+def _save_session(handle: str, session: str) -> None:
+    """Persist the session string for ``handle`` readable only by the user."""
+
+    if SESSION_CACHE_PATH is None:
+        return
+    try:
+        SESSION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(SESSION_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as cache_file:
+            json.dump({"handle": handle, "session": session}, cache_file)
+        os.chmod(SESSION_CACHE_PATH, 0o600)
+    except OSError:
+        return
+
+
+def _login(client: Client, handle: str, password: str) -> None:
+    """Log in, reusing a cached session for ``handle`` when it is still valid."""
+
+    session = _load_session(handle)
+    if session:
+        try:
+            client.login(session_string=session)
+        except Exception:  # noqa: BLE001 - expired or revoked; use the password
+            session = None
+    if not session:
+        client.login(handle, password)
+    # Tokens may have been refreshed during login; keep the latest pair.
+    _save_session(handle, client.export_session_string())
+
+
+def _get_author_identifier(post_data: dict) -> str | None:
+    """Return a stable author identifier for a feed item's ``post`` payload."""
+
+    author = post_data.get("author") or {}
     return author.get("did") or author.get("handle")
 
 
@@ -41,53 +98,60 @@ def find_self_threads(posts: list[dict]) -> list[list[dict]]:
     """
 
     posts_by_uri: dict[str, dict] = {}
+    author_by_uri: dict[str, str | None] = {}
+    record_by_uri: dict[str, dict] = {}
     parent_map: dict[str, str] = {}
 
-    # First capture all posts by URI so we can evaluate author relationships.
-    for post in posts:
-        uri = post.get("post", {}).get("uri")
-        if uri:
-            posts_by_uri[uri] = post
-
-    # Build parent mapping only when the parent exists locally and authors match.
+    # Index every post by URI once, caching its author and record.
     for post in posts:
-        uri = post.get("post", {}).get("uri")
-        record = post.get("post", {}).get("record", {})
+        post_data = post.get("post") or {}
+        uri = post_data.get("uri")
         if not uri:
             continue
+        posts_by_uri[uri] = post
+        author_by_uri[uri] = _get_author_identifier(post_data)
+        record_by_uri[uri] = post_data.get("record") or {}
 
+    # Build parent mapping only when the parent exists locally and authors match.
+    for uri, record in record_by_uri.items():
         parent_uri = _extract_reply_parent_uri(record)
-        if not parent_uri:
-            continue
-
-        parent_post = posts_by_uri.get(parent_uri)
-        if not parent_post:
+        if parent_uri not in author_by_uri:
             continue
 
-        if _get_author_identifier(parent_post) != _get_author_identifier(post):
+        if author_by_uri[parent_uri] != author_by_uri[uri]:
             continue
 
         parent_map[uri] = parent_uri
 
     threads: list[list[dict]] = []
-    children = set(parent_map.keys())
-    parents = set(parent_map.values())
-    leaves = [uri for uri in children if uri not in parents]
+    reply_counts = Counter(parent_map.values())
+    leaves = [uri for uri in parent_map if uri not in reply_counts]
+    # Root-to-node chains for posts with several replies, so sibling branches
+    # reuse the shared ancestry instead of walking it again.
+    branch_points = {uri for uri, count in reply_counts.items() if count > 1}
+    chains_to: dict[str, list[dict]] = {}
 
     for leaf_uri in leaves:
-        chain: list[dict] = []
-        current_uri = leaf_uri
-
-        while current_uri:
-            post = posts_by_uri.get(current_uri)
-            if not post:
+        pending: list[str] = []
+        visited: set[str] = set()
+        current_uri: str | None = leaf_uri
+
+        # Walk up until the root, a cached branch point, or a reply cycle.
+        while current_uri and current_uri not in chains_to:
+            if current_uri in visited:
+                current_uri = None
                 break
-
-            chain.append(post)
+            visited.add(current_uri)
+            pending.append(current_uri)
             current_uri = parent_map.get(current_uri)
 
+        chain = list(chains_to[current_uri]) if current_uri else []
+        for uri in reversed(pending):
+            chain.append(posts_by_uri[uri])
+            if uri in branch_points:
+                chains_to[uri] = chain.copy()
+
         if len(chain) > 1:
-            chain.reverse()
             threads.append(chain)
 
     return threads
@@ -144,9 +208,29 @@ def consolidate_threads_to_posts(threads: list[list[dict]]) -> list[dict]:
     return consolidated
 
 
+def _get_created_at(item: object) -> str | None:
+    """Return the ``created_at`` string of a feed item model's post record.
+
+    Records without a typed ``created_at`` attribute (e.g. unknown record types
+    kept as plain dicts) fall back to looking the value up in ``model_dump()``.
+    """
+
+    record = getattr(getattr(item, "post", None), "record", None)
+    created_at = getattr(record, "created_at", None)
+    if created_at is None:
+        created_at = (
+            item.model_dump().get("post", {}).get("record", {}).get("created_at")
+        )
+    return created_at if isinstance(created_at, str) else None
+
+
+@lru_cache(maxsize=4096)
 def parse_timestamp(iso_string: str) -> datetime:
     """Parse ISO 8601 timestamp from Bluesky API.
 
+    Results are cached: the same ``created_at`` string is parsed while fetching
+    and again when mapping posts to content.
+
     Args:
         iso_string: ISO 8601 formatted timestamp string
             (e.g., "2025-01-06T14:04:52.233Z")
@@ -154,7 +238,8 @@ def parse_timestamp(iso_string: str) -> datetime:
     Returns:
         Timezone-aware datetime object in UTC
     """
-    return datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
+    # fromisoformat accepts the trailing "Z" natively on Python 3.11+
+    return datetime.fromisoformat(iso_string)
 
 
 def fetch_feed_posts(
@@ -209,7 +294,7 @@ def fetch_feed_posts(
 
     # Initialize client and authenticate
     client = Client()
-    client.login(handle, password)
+    _login(client, handle, password)
 
     all_posts: list[dict] = []
     cursor = None
@@ -229,20 +314,16 @@ def fetch_feed_posts(
 
         page_has_recent = False
         for item in response.feed:
-            post_dict = item.model_dump()
-
-            # Check if post is within date range
+            # Check the date on the model so out-of-range items are never dumped
             if cutoff is not None:
-                created_at_str = (
-                    post_dict.get("post", {}).get("record", {}).get("created_at")
-                )
+                created_at_str = _get_created_at(item)
                 if created_at_str:
                     created_at = parse_timestamp(created_at_str)
                     if created_at < cutoff:
                         continue
 
             page_has_recent = True
-            all_posts.append(post_dict)
+            all_posts.append(item.model_dump())
 
             if len(all_posts) >= limit:
                 break
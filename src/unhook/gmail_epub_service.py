@@ -2,31 +2,64 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import hashlib
 import logging
 import mimetypes
+import os
 import re
+import shutil
+import struct
+import subprocess
+import tempfile
+import time
+from concurrent.futures import Future
 from datetime import datetime
-from io import BytesIO
+from html import escape
 from pathlib import Path
 
 import bleach
 import httpx
 from ebooklib import epub
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 
+from unhook.constants import HTTP_LIMITS, MAX_CONCURRENT_DOWNLOADS
 from unhook.email_content import (
     EmailContent,
+    localize_image_tags,
     parse_raw_email,
-    replace_cid_references,
-    replace_external_image_urls,
-    strip_remote_image_tags,
 )
+from unhook.epub_builder import _COMPRESS_EXECUTOR, compress_image, write_epub
 from unhook.gmail_service import GmailConfig, GmailService
 
 logger = logging.getLogger(__name__)
 
 MAX_IMAGE_DIMENSION = 1200
-JPEG_QUALITY = 65
+# Downloads larger than this are abandoned; no newsletter image needs more.
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+# PNGs and JPEGs within MAX_IMAGE_DIMENSION and below this size are embedded
+# as-is; re-encoding small icons and logos costs a decode for little gain.
+PASSTHROUGH_MAX_BYTES = 200_000
+# Optional lossy quantizer for PNGs that must keep their alpha channel; when
+# pngquant is not installed (or this is set to None) Pillow's output is used.
+PNGQUANT_PATH: str | None = shutil.which("pngquant")
+
+# Sanitized HTML and compressed images are kept here across runs, keyed by
+# content digest, so overlapping ``since_days`` windows skip repeated work.
+# Bump the version directory whenever sanitizing or compression output changes.
+# Set to None to disable the cache.
+CACHE_DIR: Path | None = (
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "unhook"
+    / "gmail"
+    / "v5"
+)
+# Entries are rebuilt once they are this old, which bounds the cache to about a
+# month of newsletters and lets images re-published under the same URL refresh.
+CACHE_MAX_AGE_DAYS = 30
+_CACHE_NAMESPACES = ("html", "img")
+_CACHE_VERSION_RE = re.compile(r"v\d+")
 
 # HTML tags allowed in email content for EPUB
 # NOTE: table/tbody/thead/tr/td/th are intentionally excluded.
@@ -66,11 +99,28 @@ ALLOWED_ATTRIBUTES = {
     "img": ["src", "alt"],
 }
 
+# Sanitizer for the table-free newsletter allow-list above. strip=True drops
+# disallowed tags but keeps their text, so layout tables flatten into flowing
+# content. Built once at import instead of per email.
+_CLEANER = bleach.sanitizer.Cleaner(
+    tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True
+)
+
 # Pixel threshold: images with *all* stated dimensions at or below this value
 # are stripped (tracking pixels, social-action icons, tiny spacer GIFs, …).
 _SMALL_IMAGE_PX = 50
 
 
+# <head>…</head> (title, style, meta, …) plus any <style>/<script> block outside
+# it, removed in one scan; the backreference pairs each block with its own end tag.
+_NON_BODY_BLOCK_RE = re.compile(
+    r"<(head|style|script)[\s>].*?</\1>", re.DOTALL | re.IGNORECASE
+)
+_IMG_TAG_RE = re.compile(r"<img\b[^>]*/?>", re.IGNORECASE)
+_IMG_WIDTH_RE = re.compile(r'width=["\']?(\d+)')
+_IMG_HEIGHT_RE = re.compile(r'height=["\']?(\d+)')
+
+
 def _strip_non_body_content(html: str) -> str:
     """Remove <head>, <style>, and <script> blocks including their content.
 
@@ -80,15 +130,7 @@ def _strip_non_body_content(html: str) -> str:
     EPUB.  This helper removes both the tags and their inner text *before*
     bleach processes the remaining markup.
     """
-    # Remove <head>…</head> (contains <title>, <style>, <meta>, etc.)
-    html = re.sub(r"<head[\s>].*?</head>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    # Remove all <style>…</style> blocks (may appear outside <head>)
-    html = re.sub(r"<style[\s>].*?</style>", "", html, flags=re.DOTALL | re.IGNORECASE)
-    # Remove all <script>…</script> blocks
-    html = re.sub(
-        r"<script[\s>].*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE
-    )
-    return html
+    return _NON_BODY_BLOCK_RE.sub("", html)
 
 
 def _strip_small_images(html: str, max_size: int = _SMALL_IMAGE_PX) -> str:
@@ -101,8 +143,8 @@ def _strip_small_images(html: str, max_size: int = _SMALL_IMAGE_PX) -> str:
 
     def _replace(match: re.Match) -> str:
         tag = match.group(0)
-        w_match = re.search(r'width=["\']?(\d+)', tag)
-        h_match = re.search(r'height=["\']?(\d+)', tag)
+        w_match = _IMG_WIDTH_RE.search(tag)
+        h_match = _IMG_HEIGHT_RE.search(tag)
         if not w_match and not h_match:
             return tag  # no dimensions → keep
         w = int(w_match.group(1)) if w_match else 0
@@ -111,8 +153,23 @@ def _strip_small_images(html: str, max_size: int = _SMALL_IMAGE_PX) -> str:
             return ""
         return tag
 
-    return re.sub(r"<img\b[^>]*/?>", _replace, html, flags=re.IGNORECASE)
+    return _IMG_TAG_RE.sub(_replace, html)
+
 
+# Zero-width / soft-hyphen spacer divs used as preheader padding
+_SPACER_DIV_RE = re.compile(r"<div>[\u200b-\u200f\u00ad\ufeff\s\u034f]+</div>")
+# "Forwarded this email? Subscribe here for more"
+# The span limit is generous because Substack embeds very long redirect URLs.
+_FORWARDED_PROMPT_RE = re.compile(
+    r"Forwarded this email\?[\s\S]{0,3000}?for more", re.IGNORECASE
+)
+# One <a>…</a> tag: text runs and any "<" not starting "</a>" up to its own
+# closing tag. The possessive quantifiers (*+) never give back what they
+# matched, so a link without a closing tag fails in one linear scan instead of
+# backtracking through every way of splitting its body.
+_LINK_RE = re.compile(r"<a\b[^>]*+>[^<]*+(?:<(?!/a>)[^<]*+)*+</a>", re.IGNORECASE)
+# Empty <a> tags left after image/icon stripping
+_EMPTY_LINK_RE = re.compile(r"<a\b[^>]*+>\s*+</a>", re.IGNORECASE)
 
 _BOILERPLATE_LINK_TEXTS = [
     "read in app",
@@ -128,24 +185,9 @@ def _strip_email_boilerplate(html: str) -> str:
     Targets Substack-style chrome (action buttons, subscribe prompts, footers)
     but is broad enough to catch similar patterns from other providers.
     """
-    # Zero-width / soft-hyphen spacer divs used as preheader padding
-    html = re.sub(
-        r"<div>[\u200b-\u200f\u00ad\ufeff\s\u034f]+</div>",
-        "",
-        html,
-    )
-    # "Forwarded this email? Subscribe here for more"
-    # The span limit is generous because Substack embeds very long redirect URLs.
-    html = re.sub(
-        r"Forwarded this email\?.{0,3000}?for more",
-        "",
-        html,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
+    html = _SPACER_DIV_RE.sub("", html)
+    html = _FORWARDED_PROMPT_RE.sub("", html)
 
-    # Remove individual <a>…</a> tags whose text contains boilerplate.
-    # The inner pattern (?:(?!</a>).)* matches one <a> without crossing its
-    # closing tag, avoiding the greedy-match-across-document pitfall.
     def _check_link(match: re.Match) -> str:
         content_lower = match.group(0).lower()
         for text in _BOILERPLATE_LINK_TEXTS:
@@ -153,15 +195,8 @@ def _strip_email_boilerplate(html: str) -> str:
                 return ""
         return match.group(0)
 
-    html = re.sub(
-        r"<a\b[^>]*>(?:(?!</a>).)*?</a>",
-        _check_link,
-        html,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
-
-    # Remove empty <a> tags left after image/icon stripping
-    html = re.sub(r"<a\b[^>]*>\s*</a>", "", html, flags=re.IGNORECASE)
+    html = _LINK_RE.sub(_check_link, html)
+    html = _EMPTY_LINK_RE.sub("", html)
 
     return html
 
@@ -171,12 +206,149 @@ def _sanitize_email_html(html: str) -> str:
     html = _strip_non_body_content(html)
     html = _strip_small_images(html)
     html = _strip_email_boilerplate(html)
-    return bleach.clean(
-        html,
-        tags=ALLOWED_TAGS,
-        attributes=ALLOWED_ATTRIBUTES,
-        strip=True,
-    )
+    return _CLEANER.clean(html)
+
+
+def _cache_read(namespace: str, key: str) -> bytes | None:
+    """Return the cached entry for ``key``, or None on a miss."""
+    if CACHE_DIR is None:
+        return None
+    try:
+        return (CACHE_DIR / namespace / key).read_bytes()
+    except OSError:
+        return None
+
+
+def _cache_write(namespace: str, key: str, data: bytes) -> None:
+    """Store ``data`` under ``key``; a failed write only loses the entry."""
+    if CACHE_DIR is None:
+        return
+    directory = CACHE_DIR / namespace
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent workers never read a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=directory)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_name, directory / key)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+
+
+def _prune_cache() -> None:
+    """Delete stale cache entries and the directories of older cache versions.
+
+    Entries (including temp files left by a crash) are removed once they are
+    older than ``CACHE_MAX_AGE_DAYS``. Sibling ``v<N>`` directories belong to
+    earlier versions and are never read again.
+    """
+    if CACHE_DIR is None:
+        return
+    with contextlib.suppress(OSError):
+        for sibling in CACHE_DIR.parent.iterdir():
+            if sibling != CACHE_DIR and _CACHE_VERSION_RE.fullmatch(sibling.name):
+                shutil.rmtree(sibling, ignore_errors=True)
+
+    cutoff = time.time() - CACHE_MAX_AGE_DAYS * 24 * 60 * 60
+    for namespace in _CACHE_NAMESPACES:
+        try:
+            entries = list(os.scandir(CACHE_DIR / namespace))
+        except OSError:
+            continue
+        for entry in entries:
+            with contextlib.suppress(OSError):
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+
+
+def _read_cached_image(namespace: str, key: str) -> tuple[bytes, str] | None:
+    """Return a cached ``(bytes, media_type)`` image entry, if any."""
+    entry = _cache_read(namespace, key)
+    if entry is None:
+        return None
+    media_type, _, data = entry.partition(b"\n")
+    return data, media_type.decode()
+
+
+def _write_cached_image(namespace: str, key: str, image: tuple[bytes, str]) -> None:
+    """Store a ``(bytes, media_type)`` image entry."""
+    data, media_type = image
+    _cache_write(namespace, key, media_type.encode() + b"\n" + data)
+
+
+def _sanitize_email_html_cached(html: str) -> str:
+    """Sanitize HTML, reusing the result of an earlier run for the same input."""
+    key = _content_digest(html.encode()).hex()
+    cached = _cache_read("html", key)
+    if cached is not None:
+        return cached.decode()
+    sanitized = _sanitize_email_html(html)
+    _cache_write("html", key, sanitized.encode())
+    return sanitized
+
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC), which carry
+# the image dimensions
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _sniff_image(content: bytes) -> tuple[str, int, int] | None:
+    """Read ``(media_type, width, height)`` from a PNG or JPEG header.
+
+    Only the header is parsed, no pixel data is decoded. Returns None for other
+    formats, for CMYK JPEGs (which need converting) and for malformed headers.
+    """
+    if (
+        len(content) >= 24
+        and content.startswith(b"\x89PNG\r\n\x1a\n")
+        and content[12:16] == b"IHDR"
+    ):
+        width, height = struct.unpack(">II", content[16:24])
+        return "image/png", width, height
+
+    if not content.startswith(b"\xff\xd8"):
+        return None
+    offset = 2
+    while offset + 9 < len(content):
+        if content[offset] != 0xFF:
+            return None
+        marker = content[offset + 1]
+        if marker == 0xFF:  # fill byte
+            offset += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", content[offset + 5 : offset + 9])
+            if content[offset + 9] not in (1, 3):
+                return None
+            return "image/jpeg", width, height
+        (segment_length,) = struct.unpack(">H", content[offset + 2 : offset + 4])
+        offset += 2 + segment_length
+    return None
+
+
+def _quantize_png(png: bytes) -> bytes:
+    """Shrink a PNG with pngquant, returning it unchanged if that isn't possible."""
+    if PNGQUANT_PATH is None:
+        return png
+    try:
+        # --skip-if-larger exits non-zero when quantizing wouldn't help
+        result = subprocess.run(
+            [PNGQUANT_PATH, "--quality=65-85", "--speed=3", "--skip-if-larger", "-"],
+            input=png,
+            capture_output=True,
+            timeout=30,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError) as exc:
+        logger.warning("pngquant failed: %s", exc)
+        return png
+    if result.returncode != 0 or not result.stdout:
+        return png
+    return result.stdout
 
 
 def _compress_image(content: bytes, media_type: str | None) -> tuple[bytes, str]:
@@ -185,40 +357,63 @@ def _compress_image(content: bytes, media_type: str | None) -> tuple[bytes, str]
     Returns a ``(bytes, media_type)`` tuple.  The output is always in an
     EPUB-compatible format (JPEG, PNG, or GIF).
     """
-    try:
-        with Image.open(BytesIO(content)) as image:
-            image.load()
-            if image.width > MAX_IMAGE_DIMENSION or image.height > MAX_IMAGE_DIMENSION:
-                image.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
-
-            output = BytesIO()
-            has_transparency = image.mode in {"RGBA", "LA"} or (
-                "transparency" in image.info
-            )
-
-            if has_transparency:
-                image.save(output, format="PNG", optimize=True)
-                return output.getvalue(), "image/png"
-
-            image.convert("RGB").save(
-                output, format="JPEG", quality=JPEG_QUALITY, optimize=True
-            )
-            return output.getvalue(), "image/jpeg"
+    if len(content) <= PASSTHROUGH_MAX_BYTES:
+        sniffed = _sniff_image(content)
+        if sniffed is not None:
+            sniffed_type, width, height = sniffed
+            if max(width, height) <= MAX_IMAGE_DIMENSION:
+                return content, sniffed_type
 
+    try:
+        data, compressed_type = compress_image(content, MAX_IMAGE_DIMENSION)
     except (UnidentifiedImageError, OSError) as exc:
         logger.warning("Failed to compress image: %s", exc)
     except Exception as exc:  # noqa: BLE001
         logger.warning("Unexpected error compressing image: %s", exc)
+    else:
+        if compressed_type == "image/png":
+            data = _quantize_png(data)
+        return data, compressed_type
 
     return content, media_type or "image/jpeg"
 
 
+def _compress_image_cached(
+    content: bytes, media_type: str | None, cache_key: str | None = None
+) -> tuple[bytes, str]:
+    """Compress an image, reusing the result of an earlier run.
+
+    Entries are keyed by ``cache_key``, defaulting to a digest of ``content``.
+    """
+    if cache_key is None:
+        cache_key = _content_digest(content).hex()
+    cached = _read_cached_image("img", cache_key)
+    if cached is not None:
+        return cached
+    compressed = _compress_image(content, media_type)
+    _write_cached_image("img", cache_key, compressed)
+    return compressed
+
+
+def _url_cache_key(url: str) -> str:
+    """Key under which the compressed image downloaded from ``url`` is cached."""
+    return "url-" + _content_digest(url.encode()).hex()
+
+
 async def _download_image(client: httpx.AsyncClient, url: str) -> bytes | None:
-    """Download a single image from URL."""
+    """Download a single image from URL, giving up past ``MAX_IMAGE_BYTES``."""
     try:
-        response = await client.get(url, timeout=10.0, follow_redirects=True)
-        response.raise_for_status()
-        return response.content
+        async with client.stream(
+            "GET", url, timeout=10.0, follow_redirects=True
+        ) as response:
+            response.raise_for_status()
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes(65536):
+                buffer += chunk
+                if len(buffer) > MAX_IMAGE_BYTES:
+                    logger.warning("Skipping oversized image %s", url)
+                    return None
+            return bytes(buffer)
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to download image %s: %s", url, exc)
         return None
@@ -226,41 +421,109 @@ async def _download_image(client: httpx.AsyncClient, url: str) -> bytes | None:
 
 async def download_external_images(
     urls: list[str],
+    client: httpx.AsyncClient | None = None,
 ) -> dict[str, tuple[bytes, str]]:
     """Download external images concurrently.
 
     Args:
         urls: List of image URLs to download.
+        client: Optional long-lived client whose connection pool is reused; it
+            is left open. When omitted, a client is created for this call.
 
     Returns:
         Mapping from URL to ``(image_bytes, media_type)`` tuples.
     """
     results: dict[str, tuple[bytes, str]] = {}
-    unique_urls = list(set(url for url in urls if url))
+    unique_urls: list[str] = []
+    # An image fetched on an earlier run is reused without downloading it again;
+    # entries expire after CACHE_MAX_AGE_DAYS, so a changed image is refetched.
+    for url in dict.fromkeys(url for url in urls if url):
+        cached = _read_cached_image("img", _url_cache_key(url))
+        if cached is not None:
+            results[url] = cached
+        else:
+            unique_urls.append(url)
 
     if not unique_urls:
         return results
 
-    async with httpx.AsyncClient() as client:
-        for url in unique_urls:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+    async def _fetch(client: httpx.AsyncClient, url: str) -> None:
+        async with semaphore:
             content = await _download_image(client, url)
-            if content:
-                media_type, _ = mimetypes.guess_type(url)
-                results[url] = _compress_image(content, media_type)
+        if content:
+            media_type = _sniff_media_type(content) or mimetypes.guess_type(url)[0]
+            results[url] = await loop.run_in_executor(
+                _COMPRESS_EXECUTOR,
+                _compress_image_cached,
+                content,
+                media_type,
+                _url_cache_key(url),
+            )
+
+    if client is not None:
+        await asyncio.gather(*(_fetch(client, url) for url in unique_urls))
+    else:
+        async with httpx.AsyncClient(limits=HTTP_LIMITS) as owned_client:
+            await asyncio.gather(*(_fetch(owned_client, url) for url in unique_urls))
 
     return results
 
 
+# Extensions for the image types that end up in the book; anything else keeps
+# its media type in the manifest and gets a ".jpg" name.
+_EXT_BY_MIME = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+}
+# Leading bytes of the image formats newsletters embed
+_MAGIC_MEDIA_TYPES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+_MIME_BY_EXT = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+
+
 def _guess_media_type(url_or_cid: str) -> str:
     """Guess media type from URL or content ID."""
+    media_type = _MIME_BY_EXT.get(url_or_cid.rsplit(".", 1)[-1].lower())
+    if media_type:
+        return media_type
     media_type, _ = mimetypes.guess_type(url_or_cid)
     return media_type or "image/jpeg"
 
 
-def _generate_image_filename(prefix: str, index: int, media_type: str) -> str:
+def _sniff_media_type(content: bytes) -> str | None:
+    """Identify an image's media type from its leading bytes."""
+    for magic, media_type in _MAGIC_MEDIA_TYPES:
+        if content.startswith(magic):
+            return media_type
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _content_digest(content: bytes) -> bytes:
+    """Return a short digest identifying identical image bytes."""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _generate_image_filename(prefix: str, key: str, media_type: str) -> str:
     """Generate a unique filename for an image."""
-    extension = mimetypes.guess_extension(media_type) or ".jpg"
-    return f"images/{prefix}_{index}{extension}"
+    return f"images/{prefix}_{key}{_EXT_BY_MIME.get(media_type, '.jpg')}"
 
 
 class EmailEpubBuilder:
@@ -270,6 +533,16 @@ class EmailEpubBuilder:
         self.title = title
         self.language = language
 
+    def _new_book(self) -> epub.EpubBook:
+        """Return a book with metadata and navigation documents already set."""
+        book = epub.EpubBook()
+        book.set_identifier("unhook-gmail-export")
+        book.set_title(self.title)
+        book.set_language(self.language)
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+        return book
+
     def build(
         self,
         emails: list[EmailContent],
@@ -286,15 +559,54 @@ class EmailEpubBuilder:
         Returns:
             Path to the created EPUB file.
         """
-        book = epub.EpubBook()
-        book.set_identifier("unhook-gmail-export")
-        book.set_title(self.title)
-        book.set_language(self.language)
+        book = self._new_book()
 
         chapters: list[epub.EpubHtml] = []
         image_counter = 0
 
-        for idx, email_content in enumerate(emails, start=1):
+        # Logos and spacers recur across newsletters; identical bytes are
+        # compressed once and stored once, keyed by content digest.
+        compress_futures: dict[bytes, Future[tuple[bytes, str]]] = {}
+        inline_digests: list[dict[str, bytes]] = []
+        for email_content in emails:
+            digests: dict[str, bytes] = {}
+            for cid, image_bytes in email_content.inline_images.items():
+                digest = _content_digest(image_bytes)
+                if digest not in compress_futures:
+                    compress_futures[digest] = _COMPRESS_EXECUTOR.submit(
+                        _compress_image_cached,
+                        image_bytes,
+                        # Content IDs rarely carry a usable file extension
+                        _sniff_media_type(image_bytes) or _guess_media_type(cid),
+                        digest.hex(),
+                    )
+                digests[cid] = digest
+            inline_digests.append(digests)
+
+        filename_by_digest: dict[bytes, str] = {}
+
+        def add_image(digest: bytes, prefix: str, data: bytes, media_type: str) -> str:
+            nonlocal image_counter
+            filename = filename_by_digest.get(digest)
+            if filename is None:
+                image_counter += 1
+                # Named by content so a chapter's HTML, and with it the sanitize
+                # cache key, is the same on every run.
+                filename = _generate_image_filename(prefix, digest.hex(), media_type)
+                book.add_item(
+                    epub.EpubItem(
+                        uid=f"img_{image_counter}",
+                        file_name=filename,
+                        media_type=media_type,
+                        content=data,
+                    )
+                )
+                filename_by_digest[digest] = filename
+            return filename
+
+        for idx, (email_content, digests) in enumerate(
+            zip(emails, inline_digests), start=1
+        ):
             chapter_title = email_content.title[:80]
             chapter_filename = f"email_{idx}.xhtml"
 
@@ -304,46 +616,25 @@ class EmailEpubBuilder:
             url_to_filename: dict[str, str] = {}
 
             # Handle inline images (CID references)
-            for cid, image_bytes in email_content.inline_images.items():
-                image_counter += 1
-                guessed_type = _guess_media_type(cid)
-                compressed, media_type = _compress_image(image_bytes, guessed_type)
-                filename = _generate_image_filename("inline", image_counter, media_type)
-
-                image_item = epub.EpubItem(
-                    uid=f"img_{image_counter}",
-                    file_name=filename,
-                    media_type=media_type,
-                    content=compressed,
+            for cid, digest in digests.items():
+                compressed, media_type = compress_futures[digest].result()
+                cid_to_filename[cid] = add_image(
+                    digest, "inline", compressed, media_type
                 )
-                book.add_item(image_item)
-                cid_to_filename[cid] = filename
 
             # Handle external images
             for url in email_content.external_image_urls:
                 if url in external_images:
-                    image_counter += 1
                     image_data, media_type = external_images[url]
-                    filename = _generate_image_filename(
-                        "ext", image_counter, media_type
+                    url_to_filename[url] = add_image(
+                        _content_digest(image_data), "ext", image_data, media_type
                     )
 
-                    image_item = epub.EpubItem(
-                        uid=f"img_{image_counter}",
-                        file_name=filename,
-                        media_type=media_type,
-                        content=image_data,
-                    )
-                    book.add_item(image_item)
-                    url_to_filename[url] = filename
-
-            # Replace image references in HTML
-            html_body = replace_cid_references(html_body, cid_to_filename)
-            html_body = replace_external_image_urls(html_body, url_to_filename)
-            html_body = strip_remote_image_tags(html_body)
+            # Replace image references in HTML, dropping any still remote
+            html_body = localize_image_tags(html_body, cid_to_filename, url_to_filename)
 
             # Sanitize HTML
-            sanitized_html = _sanitize_email_html(html_body)
+            sanitized_html = _sanitize_email_html_cached(html_body)
 
             # Create chapter
             chapter = epub.EpubHtml(
@@ -351,8 +642,9 @@ class EmailEpubBuilder:
                 file_name=chapter_filename,
                 lang=self.language,
             )
+            # The title is plain text, so escaping is all it needs
             chapter.content = (
-                f"<h1>{bleach.clean(chapter_title)}</h1>\n{sanitized_html}"
+                f"<h1>{escape(chapter_title, quote=False)}</h1>\n{sanitized_html}"
             )
 
             book.add_item(chapter)
@@ -361,12 +653,10 @@ class EmailEpubBuilder:
         # Build table of contents and spine
         book.toc = [(epub.Section("Newsletters"), chapters)]
         book.spine = ["nav", *chapters]
-        book.add_item(epub.EpubNcx())
-        book.add_item(epub.EpubNav())
 
         # Write EPUB
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        epub.write_epub(str(output_path), book)
+        write_epub(book, output_path)
 
         logger.info("EPUB created at %s with %d emails", output_path, len(emails))
         return output_path
@@ -377,6 +667,7 @@ async def export_gmail_to_epub(
     output_dir: Path | str,
     since_days: int = 1,
     file_prefix: str = "newsletters",
+    client: httpx.AsyncClient | None = None,
 ) -> Path | None:
     """Fetch emails from Gmail and export to EPUB.
 
@@ -385,12 +676,14 @@ async def export_gmail_to_epub(
         output_dir: Directory to save the EPUB file.
         since_days: Only include emails from the last N days.
         file_prefix: Prefix for the output filename.
+        client: Optional shared HTTP client for external image downloads.
 
     Returns:
         Path to the created EPUB file, or None if no emails found.
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(_prune_cache)
 
     # Fetch emails from Gmail
     with GmailService(config) as service:
@@ -422,17 +715,15 @@ async def export_gmail_to_epub(
     # Sort by date (newest first)
     email_contents.sort(key=lambda e: e.published, reverse=True)
 
-    # Collect all external image URLs
-    all_external_urls: list[str] = []
+    # Collect all external image URLs, deduplicated in document order
+    unique_urls: dict[str, None] = {}
     for content in email_contents:
-        all_external_urls.extend(content.external_image_urls)
+        unique_urls.update(dict.fromkeys(content.external_image_urls))
 
     # Download external images
-    external_images = await download_external_images(all_external_urls)
+    external_images = await download_external_images(list(unique_urls), client=client)
     logger.info(
-        "Downloaded %d/%d external images",
-        len(external_images),
-        len(set(all_external_urls)),
+        "Downloaded %d/%d external images", len(external_images), len(unique_urls)
     )
 
     # Build EPUB
@@ -440,7 +731,10 @@ async def export_gmail_to_epub(
     output_path = output_dir / f"{file_prefix}-{timestamp}.epub"
 
     builder = EmailEpubBuilder(title=f"Newsletters - {timestamp}")
-    return builder.build(email_contents, external_images, output_path)
+    # Zip writing and compression are CPU-bound; keep them off the event loop
+    return await asyncio.to_thread(
+        builder.build, email_contents, external_images, output_path
+    )
 
 
 __all__ = ["EmailEpubBuilder", "export_gmail_to_epub"]
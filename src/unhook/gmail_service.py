@@ -5,10 +5,14 @@ from __future__ import annotations
 import email
 import imaplib
 import logging
+import queue
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from email.header import decode_header
 from email.message import Message
+from email.utils import parsedate_to_datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -18,9 +22,18 @@ logger = logging.getLogger(__name__)
 
 GMAIL_IMAP_HOST = "imap.gmail.com"
 GMAIL_IMAP_PORT = 993
-
-
-@dataclass
+# Messages requested per FETCH command; one round-trip per batch instead of
+# one per message.
+FETCH_BATCH_SIZE = 50
+# BODY.PEEK[] returns the full message like RFC822 but never sets \Seen, so the
+# fetch stays side-effect free even if the mailbox is not opened read-only.
+FETCH_ITEMS = "(UID BODY.PEEK[])"
+# Upper bound on IMAP connections used to fetch batches in parallel (Gmail
+# allows around 15 per account).
+MAX_IMAP_CONNECTIONS = 4
+
+
+@dataclass(slots=True)
 class GmailConfig:
     """Configuration for Gmail IMAP connection."""
 
@@ -29,7 +42,7 @@ class GmailConfig:
     label: str = "newsletters-kindle"
 
 
-@dataclass
+@dataclass(slots=True)
 class RawEmail:
     """Raw email data from IMAP."""
 
@@ -109,8 +122,80 @@ class GmailService:
         message_ids = data[0].split()
         logger.info("Found %d emails in label %s", len(message_ids), self.config.label)
 
+        batches = [
+            message_ids[start : start + FETCH_BATCH_SIZE]
+            for start in range(0, len(message_ids), FETCH_BATCH_SIZE)
+        ]
+        if len(batches) == 1:
+            return self._fetch_batch_or_retry(batches[0])
+        return self._fetch_batches_concurrently(batches, label_path)
+
+    def _fetch_batches_concurrently(
+        self, batches: list[list[bytes]], label_path: str
+    ) -> list[RawEmail]:
+        """Spread FETCH batches over a small pool of IMAP connections.
+
+        Extra connections are opened for the duration of the call and closed
+        afterwards; if any fail to open, the remaining ones (always including
+        this service's own connection) carry the load.
+        """
+        workers = min(MAX_IMAP_CONNECTIONS, len(batches))
+        services: queue.Queue[GmailService] = queue.Queue()
+        services.put(self)
+
+        def fetch(batch: list[bytes]) -> list[RawEmail]:
+            service = services.get()
+            try:
+                return service._fetch_batch_or_retry(batch)
+            finally:
+                services.put(service)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            extras = [
+                extra
+                for extra in pool.map(
+                    lambda _: self._open_worker(label_path), range(workers - 1)
+                )
+                if extra is not None
+            ]
+            for extra in extras:
+                services.put(extra)
+            try:
+                results = list(pool.map(fetch, batches))
+            finally:
+                for extra in extras:
+                    extra.disconnect()
+
+        return [raw_email for batch in results for raw_email in batch]
+
+    def _open_worker(self, label_path: str) -> GmailService | None:
+        """Open another connection with the label selected, or None on failure."""
+        worker = GmailService(self.config)
+        try:
+            worker.connect()
+            status, _ = worker._connection.select(label_path, readonly=True)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Could not open extra IMAP connection: %s", exc)
+            worker.disconnect()
+            return None
+        if status != "OK":
+            worker.disconnect()
+            return None
+        return worker
+
+    def _fetch_batch_or_retry(self, msg_ids: list[bytes]) -> list[RawEmail]:
+        """Fetch a batch, falling back to one FETCH per message on failure."""
+        try:
+            return self._fetch_batch(msg_ids)
+        except Exception as exc:  # noqa: BLE001
+            # Retry one by one so a single bad message doesn't drop the batch
+            logger.warning("Batch fetch failed, retrying individually: %s", exc)
+            return self._fetch_individually(msg_ids)
+
+    def _fetch_individually(self, msg_ids: list[bytes]) -> list[RawEmail]:
+        """Fetch emails one FETCH command at a time, skipping failures."""
         emails: list[RawEmail] = []
-        for msg_id in message_ids:
+        for msg_id in msg_ids:
             try:
                 raw_email = self._fetch_single_email(msg_id)
                 if raw_email:
@@ -118,7 +203,6 @@ class GmailService:
             except Exception as exc:  # noqa: BLE001
                 logger.warning("Failed to fetch email %s: %s", msg_id, exc)
                 continue
-
         return emails
 
     def _format_label_path(self, label: str) -> str:
@@ -138,15 +222,48 @@ class GmailService:
         if not self._connection:
             return None
 
-        status, data = self._connection.fetch(msg_id, "(RFC822 UID)")
+        status, data = self._connection.fetch(msg_id, FETCH_ITEMS)
         if status != "OK" or not data or not data[0]:
             return None
 
+        if not isinstance(data[0], tuple):
+            return None
+        return self._parse_fetch_tuple(data[0])
+
+    def _fetch_batch(self, msg_ids: list[bytes]) -> list[RawEmail]:
+        """Fetch and parse several emails with a single FETCH command."""
+        if not self._connection:
+            return []
+
+        status, data = self._connection.fetch(b",".join(msg_ids), FETCH_ITEMS)
+        if status != "OK":
+            # Let the caller retry per message rather than dropping the batch
+            msg = f"FETCH returned {status}"
+            raise RuntimeError(msg)
+        if not data:
+            return []
+
+        emails: list[RawEmail] = []
+        # Each message arrives as a (header, body) tuple followed by b")"
+        for item in data:
+            if not isinstance(item, tuple):
+                continue
+            try:
+                raw_email = self._parse_fetch_tuple(item)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to parse email %s: %s", item[0], exc)
+                continue
+            if raw_email:
+                emails.append(raw_email)
+        return emails
+
+    def _parse_fetch_tuple(self, item: tuple) -> RawEmail | None:
+        """Parse one ``(header, body)`` pair from an IMAP fetch response."""
         # Extract UID from response
-        uid = self._extract_uid(data)
+        uid = self._extract_uid([item])
 
         # Parse email content
-        raw_bytes = data[0][1] if isinstance(data[0], tuple) else None
+        raw_bytes = item[1]
         if not raw_bytes:
             return None
 
@@ -155,7 +272,7 @@ class GmailService:
 
     def _extract_uid(self, data: list) -> str:
         """Extract UID from IMAP fetch response."""
-        # Response format: (b'1 (UID 123 RFC822 {size}', b'...')
+        # Response format: (b'1 (UID 123 BODY[] {size}', b'...')
         if data and isinstance(data[0], tuple):
             header = data[0][0]
             if isinstance(header, bytes):
@@ -225,7 +342,7 @@ class GmailService:
         if not header:
             return ""
 
-        decoded_parts = email.header.decode_header(header)
+        decoded_parts = decode_header(header)
         result = []
         for content, charset in decoded_parts:
             if isinstance(content, bytes):
@@ -249,9 +366,7 @@ class GmailService:
             return datetime.now(UTC)
 
         try:
-            # email.utils.parsedate_to_datetime handles most email date formats
-            from email.utils import parsedate_to_datetime
-
+            # parsedate_to_datetime handles most email date formats
             dt = parsedate_to_datetime(date_str)
             # Ensure timezone-aware
             if dt.tzinfo is None:
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import UTC, datetime
 
@@ -15,8 +15,17 @@ from unhook.constants import (
 )
 from unhook.feed import parse_timestamp
 
+# Quoted-record views that carry no readable post
+_UNAVAILABLE_RECORD_VIEW_TYPES = frozenset(
+    {
+        BSKY_EMBED_RECORD_VIEW_BLOCKED,
+        BSKY_EMBED_RECORD_VIEW_NOT_FOUND,
+        BSKY_EMBED_RECORD_VIEW_DETACHED,
+    }
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class PostContent:
     """Representation of a feed post for EPUB creation."""
 
@@ -35,7 +44,10 @@ def dedupe_posts(posts: Iterable[dict]) -> list[dict]:
     unique_posts: list[dict] = []
 
     for post in posts:
-        uri = post.get("post", {}).get("uri")
+        post_data = post.get("post")
+        if not post_data:
+            continue
+        uri = post_data.get("uri")
         if uri and uri not in seen:
             seen.add(uri)
             unique_posts.append(post)
@@ -46,44 +58,73 @@ def dedupe_posts(posts: Iterable[dict]) -> list[dict]:
 def map_posts_to_content(posts: Iterable[dict]) -> list[PostContent]:
     """Convert feed responses into :class:`PostContent` records."""
 
+    return list(iter_posts_to_content(posts))
+
+
+def iter_posts_to_content(posts: Iterable[dict]) -> Iterator[PostContent]:
+    """Lazily convert feed responses into :class:`PostContent` records.
+
+    Each record is built only when requested, so a consumer that handles posts
+    one at a time never holds the whole converted feed in memory.
+    """
+
+    for raw in posts:
+        yield _build_post_content(raw.get("post", {}))
+
+
+def dedupe_and_map(posts: Iterable[dict]) -> list[PostContent]:
+    """Drop duplicate URIs and convert to :class:`PostContent` in one pass.
+
+    Equivalent to ``map_posts_to_content(dedupe_posts(posts))`` without the
+    intermediate list.
+    """
+
+    seen: set[str] = set()
     mapped: list[PostContent] = []
     for raw in posts:
-        post_data = raw.get("post", {})
-        author_data = post_data.get("author", {})
-        record = post_data.get("record", {})
-
-        body = record.get("text", "").strip()
-        facets = record.get("facets")
-        if not isinstance(facets, list) and hasattr(facets, "tolist"):
-            facets = facets.tolist()
-        if isinstance(facets, list):
-            body = _apply_link_facets(body, facets)
-        quote_author, quote_text = _extract_quote_content(post_data)
-        if quote_text:
-            label = quote_author or "quoted post"
-            quoted_section = f"Quoted from {label}:\n{quote_text}"
-            body = f"{body}\n\n{quoted_section}" if body else quoted_section
-
-        created_at_str = record.get("created_at")
-        published = (
-            parse_timestamp(created_at_str) if created_at_str else datetime.now(UTC)
-        )
-        title = body.split("\n", 1)[0][:60] if body else "Untitled"
-        image_urls = _extract_image_urls(post_data)
-
-        mapped.append(
-            PostContent(
-                title=title or "Untitled",
-                author=author_data.get("handle") or author_data.get("did", "unknown"),
-                published=published,
-                body=body,
-                image_urls=image_urls,
-            )
-        )
+        post_data = raw.get("post")
+        if not post_data:
+            continue
+        uri = post_data.get("uri")
+        if uri and uri not in seen:
+            seen.add(uri)
+            mapped.append(_build_post_content(post_data))
 
     return mapped
 
 
+def _build_post_content(post_data: dict) -> PostContent:
+    """Build a :class:`PostContent` from the ``post`` payload of a feed item."""
+
+    author_data = post_data.get("author", {})
+    record = post_data.get("record", {})
+
+    body = record.get("text", "").strip()
+    facets = record.get("facets")
+    if not isinstance(facets, list) and hasattr(facets, "tolist"):
+        facets = facets.tolist()
+    if isinstance(facets, list):
+        body = _apply_link_facets(body, facets)
+    quote_author, quote_text = _extract_quote_content(post_data)
+    if quote_text:
+        label = quote_author or "quoted post"
+        quoted_section = f"Quoted from {label}:\n{quote_text}"
+        body = f"{body}\n\n{quoted_section}" if body else quoted_section
+
+    created_at_str = record.get("created_at")
+    published = parse_timestamp(created_at_str) if created_at_str else datetime.now(UTC)
+    title = body.split("\n", 1)[0][:60] if body else "Untitled"
+    image_urls = _extract_image_urls(post_data)
+
+    return PostContent(
+        title=title or "Untitled",
+        author=author_data.get("handle") or author_data.get("did", "unknown"),
+        published=published,
+        body=body,
+        image_urls=image_urls,
+    )
+
+
 def _extract_image_urls(post_data: dict) -> list[str]:
     """Extract image URLs from a feed post."""
 
@@ -100,10 +141,9 @@ def _extract_image_urls(post_data: dict) -> list[str]:
         urls = []
         for image in images:
             if isinstance(image, dict):
-                if image.get("fullsize"):
-                    urls.append(image["fullsize"])
-                elif image.get("thumb"):
-                    urls.append(image["thumb"])
+                url = image.get("fullsize") or image.get("thumb")
+                if url:
+                    urls.append(url)
         return urls
 
     return []
@@ -115,7 +155,6 @@ def _apply_link_facets(text: str, facets: list[dict]) -> str:
     if not text or not facets:
         return text
 
-    byte_text = text.encode("utf-8")
     replacements: list[tuple[int, int, str]] = []
 
     def coerce_int(value: object) -> int | None:
@@ -138,11 +177,14 @@ def _apply_link_facets(text: str, facets: list[dict]) -> str:
         index = facet.get("index")
         if not isinstance(index, dict):
             continue
-        byte_start = coerce_int(index.get("byteStart") or index.get("byte_start"))
-        byte_end = coerce_int(index.get("byteEnd") or index.get("byte_end"))
+        # Raw JSON uses camelCase, dumped models snake_case; 0 is a valid start
+        start = index.get("byteStart")
+        end = index.get("byteEnd")
+        byte_start = coerce_int(index.get("byte_start") if start is None else start)
+        byte_end = coerce_int(index.get("byte_end") if end is None else end)
         if byte_start is None or byte_end is None:
             continue
-        if byte_start < 0 or byte_end > len(byte_text) or byte_start >= byte_end:
+        if byte_start < 0 or byte_start >= byte_end:
             continue
 
         features = normalize_list(facet.get("features"))
@@ -161,15 +203,33 @@ def _apply_link_facets(text: str, facets: list[dict]) -> str:
 
         replacements.append((byte_start, byte_end, link_feature["uri"]))
 
-    numbered: list[tuple[int, int, str, str]] = []
-    for idx, (byte_start, byte_end, uri) in enumerate(sorted(replacements), start=1):
-        numbered.append((byte_start, byte_end, uri, f"link{idx}"))
+    # Mentions and hashtags are facets too; without links nothing changes
+    if not replacements:
+        return text
 
-    for byte_start, byte_end, uri, label in sorted(numbered, reverse=True):
-        replacement = f"[{label}]({uri})".encode()
-        byte_text = byte_text[:byte_start] + replacement + byte_text[byte_end:]
+    # Facet offsets count UTF-8 bytes. For ASCII text they are also character
+    # offsets, so the str is spliced directly instead of being transcoded.
+    is_ascii = text.isascii()
+    source: str | bytes = text if is_ascii else text.encode("utf-8")
+
+    # Stitch the output left to right; a facet overlapping an earlier link
+    # is dropped, since its range no longer exists in the rewritten text.
+    parts: list = []
+    cursor = 0
+    link_count = 0
+    for byte_start, byte_end, uri in sorted(replacements):
+        if byte_start < cursor or byte_end > len(source):
+            continue
+        link_count += 1
+        link = f"[link{link_count}]({uri})"
+        parts.append(source[cursor:byte_start])
+        parts.append(link if is_ascii else link.encode())
+        cursor = byte_end
+    parts.append(source[cursor:])
 
-    return byte_text.decode("utf-8", errors="replace")
+    if is_ascii:
+        return "".join(parts)
+    return b"".join(parts).decode("utf-8", errors="replace")
 
 
 def _extract_quote_content(post_data: dict) -> tuple[str | None, str | None]:
@@ -184,23 +244,20 @@ def _extract_quote_content(post_data: dict) -> tuple[str | None, str | None]:
     if not isinstance(record_view, dict):
         return None, None
 
-    record_type = get_type_field(record_view)
-    if record_type in {
-        BSKY_EMBED_RECORD_VIEW_BLOCKED,
-        BSKY_EMBED_RECORD_VIEW_NOT_FOUND,
-        BSKY_EMBED_RECORD_VIEW_DETACHED,
-    }:
+    if get_type_field(record_view) in _UNAVAILABLE_RECORD_VIEW_TYPES:
         return None, None
 
-    author = (
-        record_view.get("author") if isinstance(record_view.get("author"), dict) else {}
-    )
-    value = (
-        record_view.get("value") if isinstance(record_view.get("value"), dict) else {}
-    )
+    author = record_view.get("author")
+    if not isinstance(author, dict):
+        author = {}
+    value = record_view.get("value")
+    if not isinstance(value, dict):
+        value = {}
 
     author_identifier = author.get("handle") or author.get("did")
-    quoted_text = value.get("text") if isinstance(value.get("text"), str) else None
+    quoted_text = value.get("text")
+    if not isinstance(quoted_text, str):
+        quoted_text = None
 
     return author_identifier, quoted_text
 
@@ -230,4 +287,10 @@ def _is_view_record(candidate: dict) -> bool:
     )
 
 
-__all__ = ["PostContent", "dedupe_posts", "map_posts_to_content"]
+__all__ = [
+    "PostContent",
+    "dedupe_and_map",
+    "dedupe_posts",
+    "iter_posts_to_content",
+    "map_posts_to_content",
+]
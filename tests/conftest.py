@@ -65,9 +65,10 @@ def make_post_mock(post_id: int, text: str, created_at: str) -> MagicMock:
         created_at: ISO timestamp string.
 
     Returns:
-        A MagicMock with a model_dump method.
+        A MagicMock with a model_dump method and ``post.record.created_at``.
     """
     return MagicMock(
+        post=MagicMock(record=MagicMock(created_at=created_at)),
         model_dump=lambda post_id=post_id, text=text, created_at=created_at: {
             "post": {
                 "uri": f"at://did:plc:test/app.bsky.feed.post/{post_id}",
@@ -81,7 +82,7 @@ def make_post_mock(post_id: int, text: str, created_at: str) -> MagicMock:
                     "created_at": created_at,
                 },
             }
-        }
+        },
     )
 
 
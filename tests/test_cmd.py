@@ -1,5 +1,7 @@
 """Test cases for the __main__ module."""
 
+import subprocess
+import sys
 from datetime import UTC, datetime
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -69,9 +71,22 @@ def test_main_succeeds(runner: CliRunner) -> None:
     assert result.exit_code == 0
 
 
+def test_cli_import_does_not_load_feed_stack() -> None:
+    """It defers heavy imports until a command actually runs."""
+    code = (
+        "import sys, unhook.cmd; "
+        "print([m for m in ('pyarrow', 'unhook.feed', 'unhook.epub_service') "
+        "if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
 def test_fetch_command_default_filename(runner: CliRunner, sample_posts, tmp_path):
     """It saves file with default date-based filename."""
-    with patch("unhook.cmd.fetch_feed_posts") as mock_fetch:
+    with patch("unhook.feed.fetch_feed_posts") as mock_fetch:
         mock_fetch.return_value = sample_posts
 
         with patch("unhook.cmd.date") as mock_date:
@@ -88,7 +103,7 @@ def test_fetch_command_default_filename(runner: CliRunner, sample_posts, tmp_pat
 
 def test_fetch_command_custom_filename(runner: CliRunner, sample_posts, tmp_path):
     """It saves file with custom filename."""
-    with patch("unhook.cmd.fetch_feed_posts") as mock_fetch:
+    with patch("unhook.feed.fetch_feed_posts") as mock_fetch:
         mock_fetch.return_value = sample_posts
 
         with runner.isolated_filesystem(temp_dir=tmp_path):
@@ -101,7 +116,7 @@ def test_fetch_command_custom_filename(runner: CliRunner, sample_posts, tmp_path
 
 def test_fetch_command_mocked_posts_in_file(runner: CliRunner, sample_posts, tmp_path):
     """It writes mocked posts data to parquet file correctly."""
-    with patch("unhook.cmd.fetch_feed_posts") as mock_fetch:
+    with patch("unhook.feed.fetch_feed_posts") as mock_fetch:
         mock_fetch.return_value = sample_posts
 
         with runner.isolated_filesystem(temp_dir=tmp_path):
@@ -116,6 +131,23 @@ def test_fetch_command_mocked_posts_in_file(runner: CliRunner, sample_posts, tmp
             assert df.iloc[1]["post"]["record"]["text"].startswith("Test post 2")
 
 
+def test_fetch_command_feather_format(runner: CliRunner, sample_posts, tmp_path):
+    """It writes posts as feather when requested."""
+    with patch("unhook.feed.fetch_feed_posts") as mock_fetch:
+        mock_fetch.return_value = sample_posts
+
+        with runner.isolated_filesystem(temp_dir=tmp_path):
+            result = runner.invoke(
+                app, ["fetch", "--format", "feather", "--output", "test.feather"]
+            )
+
+            assert result.exit_code == 0
+
+            df = pd.read_feather("test.feather")
+            assert len(df) == 2
+            assert df.iloc[0]["post"]["record"]["text"].startswith("Test post 1")
+
+
 def test_fetch_writes_actual_file(runner: CliRunner, sample_posts, tmp_path):
     """Integration test - export fetched posts to an EPUB file."""
 
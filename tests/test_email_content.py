@@ -6,6 +6,7 @@ import pytest
 
 from unhook.email_content import (
     EmailContent,
+    localize_image_tags,
     parse_raw_email,
     replace_cid_references,
     replace_external_image_urls,
@@ -291,3 +292,74 @@ class TestStripRemoteImageTags:
     def test_handles_empty_html(self):
         """It handles empty HTML."""
         assert strip_remote_image_tags("") == ""
+
+
+class TestLocalizeImageTags:
+    """Tests for localize_image_tags function."""
+
+    def test_replaces_resolved_and_strips_unresolved_remote(self):
+        """It rewrites mapped sources and drops remote images left over."""
+        html = (
+            '<img src="cid:logo"><img src="https://example.com/a.jpg">'
+            '<p>Text</p><img src="https://example.com/missing.jpg">'
+        )
+        result = localize_image_tags(
+            html,
+            {"logo": "images/inline_1.jpg"},
+            {"https://example.com/a.jpg": "images/ext_2.jpg"},
+        )
+        assert result == (
+            '<img src="images/inline_1.jpg"><img src="images/ext_2.jpg"><p>Text</p>'
+        )
+
+    def test_keeps_unmapped_non_remote_images(self):
+        """It keeps cid: and data: images it cannot resolve."""
+        html = '<img src="cid:unknown"><img src="data:image/png;base64,abc">'
+        assert localize_image_tags(html, {}, {}) == html
+
+    def test_handles_quoting_spacing_and_case_variants(self):
+        """It resolves single-quoted sources and strips odd remote spellings."""
+        html = (
+            '<p>a</p><img alt="x" src="cid:one"><img src=\'https://b.com/2.png\'>'
+            '<img SRC = "http://c.com/3.gif"><img src=https://d.com/4.jpg>'
+        )
+        cid_map = {"one": "images/1.jpg"}
+        url_map = {"https://b.com/2.png": "images/2.png"}
+        result = localize_image_tags(html, cid_map, url_map)
+        assert result == (
+            '<p>a</p><img alt="x" src="images/1.jpg"><img src="images/2.png">'
+        )
+
+    def test_only_rewrites_image_sources(self):
+        """It leaves matching URLs outside of <img src> untouched."""
+        html = (
+            '<a href="https://example.com/image.jpg">'
+            '<img src="https://example.com/image.jpg"></a>'
+        )
+        url_map = {"https://example.com/image.jpg": "images/ext_1.jpg"}
+        result = localize_image_tags(html, {}, url_map)
+        assert result == (
+            '<a href="https://example.com/image.jpg"><img src="images/ext_1.jpg"></a>'
+        )
+
+    def test_keeps_local_images(self):
+        """It keeps images that already reference EPUB files."""
+        html = '<img src="images/ext_1.jpg">'
+        assert localize_image_tags(html, {}, {}) == html
+
+    def test_handles_empty_html(self):
+        """It handles empty HTML."""
+        assert localize_image_tags("", {"cid": "file"}, {"url": "file"}) == ""
+
+    def test_matches_separate_passes(self):
+        """It produces the same HTML as the replace and strip helpers in turn."""
+        html = (
+            '<p>a</p><img alt="x" src="cid:one"><img src=\'https://b.com/2.png\'>'
+            '<img SRC = "http://c.com/3.gif"><img src="https://d.com/4.jpg">'
+        )
+        cid_map = {"one": "images/1.jpg"}
+        url_map = {"https://b.com/2.png": "images/2.png"}
+        expected = strip_remote_image_tags(
+            replace_external_image_urls(replace_cid_references(html, cid_map), url_map)
+        )
+        assert localize_image_tags(html, cid_map, url_map) == expected
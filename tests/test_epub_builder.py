@@ -1,10 +1,24 @@
 """Tests for EPUB creation utilities."""
 
+import os
+import zipfile
 from datetime import UTC, datetime
+from io import BytesIO
 
 from ebooklib import ITEM_DOCUMENT, ITEM_IMAGE, epub
+from PIL import Image
 
-from unhook.epub_builder import EpubBuilder, _escape_hashtags
+from unhook import epub_builder
+from unhook.epub_builder import (
+    JPEG_QUALITY,
+    MIN_JPEG_QUALITY,
+    EpubBuilder,
+    _escape_hashtags,
+    _guess_extension,
+    compress_image,
+    encode_jpeg,
+    render_post_bodies,
+)
 from unhook.post_content import PostContent
 
 
@@ -35,6 +49,60 @@ def test_epub_builder_creates_chapter_and_image(tmp_path):
     assert "tester.bsky.social" in html_bodies
 
 
+def test_epub_builder_stores_shared_images_once(tmp_path):
+    """Posts that share an image URL reference a single EPUB image item."""
+    image_url = "https://example.com/shared.jpg"
+    posts = [
+        PostContent(
+            title=f"Post {idx}",
+            author="tester.bsky.social",
+            published=datetime(2024, 1, 1, tzinfo=UTC),
+            body=f"Post {idx}",
+            image_urls=[image_url],
+        )
+        for idx in range(2)
+    ]
+
+    output = tmp_path / "output.epub"
+    EpubBuilder(title="Test Export").build(
+        posts, {image_url: (b"imgdata", "image/jpeg")}, output
+    )
+
+    book = epub.read_epub(output)
+    images = list(book.get_items_of_type(ITEM_IMAGE))
+    documents = list(book.get_items_of_type(ITEM_DOCUMENT))
+    html_content = "\n".join(doc.get_content().decode() for doc in documents)
+
+    assert len(images) == 1
+    assert html_content.count(images[0].file_name) == 2
+
+
+def test_epub_builder_stores_images_without_deflate(tmp_path):
+    """Images are stored uncompressed while markup is deflated."""
+    post = PostContent(
+        title="Sample Post",
+        author="tester.bsky.social",
+        published=datetime(2024, 1, 1, tzinfo=UTC),
+        body="Hello world",
+        image_urls=["https://example.com/image.jpg"],
+    )
+
+    output = tmp_path / "output.epub"
+    EpubBuilder(title="Test Export").build(
+        [post], {"https://example.com/image.jpg": (b"imgdata", "image/jpeg")}, output
+    )
+
+    with zipfile.ZipFile(output) as archive:
+        compression = {info.filename: info.compress_type for info in archive.infolist()}
+
+    image_entries = [name for name in compression if name.endswith(".jpg")]
+    assert len(image_entries) == 1
+    assert compression[image_entries[0]] == zipfile.ZIP_STORED
+    assert compression["mimetype"] == zipfile.ZIP_STORED
+    chapter_entries = [name for name in compression if name.endswith("post_1.xhtml")]
+    assert compression[chapter_entries[0]] == zipfile.ZIP_DEFLATED
+
+
 def test_epub_builder_handles_empty_posts(tmp_path):
     builder = EpubBuilder(title="Test Export")
     output = tmp_path / "output.epub"
@@ -50,6 +118,61 @@ def test_epub_builder_handles_empty_posts(tmp_path):
     assert b"No posts available" in post_docs[0].get_content()
 
 
+def test_epub_builder_renders_large_exports_in_worker_pool(tmp_path, monkeypatch):
+    """Exports above the threshold render post bodies through the pool."""
+    chunk_sizes: list[int] = []
+    start_methods: list[str] = []
+
+    class InlineExecutor:
+        def __init__(self, mp_context):
+            start_methods.append(mp_context.get_start_method())
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return None
+
+        def map(self, fn, iterable, chunksize=1):
+            chunk_sizes.append(chunksize)
+            return map(fn, iterable)
+
+    monkeypatch.setattr(epub_builder, "ProcessPoolExecutor", InlineExecutor)
+    monkeypatch.setattr(epub_builder, "_PARALLEL_RENDER_THRESHOLD", 1)
+    posts = [
+        PostContent(
+            title=f"Post {idx}",
+            author="tester.bsky.social",
+            published=datetime(2024, 1, 1, tzinfo=UTC),
+            body=f"**Post {idx}**",
+            image_urls=[],
+        )
+        for idx in range(3)
+    ]
+
+    output = tmp_path / "output.epub"
+    EpubBuilder(title="Test Export").build(posts, {}, output)
+
+    book = epub.read_epub(output)
+    documents = list(book.get_items_of_type(ITEM_DOCUMENT))
+    html_content = "\n".join(doc.get_content().decode() for doc in documents)
+
+    assert chunk_sizes == [16]
+    assert "<strong>Post 2</strong>" in html_content
+    assert start_methods and start_methods[0] != "fork"
+
+
+def test_render_post_bodies_uses_real_worker_pool(monkeypatch):
+    """Bodies above the threshold render correctly in worker processes."""
+    monkeypatch.setattr(epub_builder, "_PARALLEL_RENDER_THRESHOLD", 1)
+    bodies = [f"**Post {idx}**" for idx in range(3)]
+
+    rendered = render_post_bodies(bodies)
+
+    assert rendered == [epub_builder._sanitize_content(body) for body in bodies]
+    assert "<strong>Post 2</strong>" in rendered[2]
+
+
 def test_escape_hashtags_at_line_start():
     """Hashtags at line start should be escaped to prevent heading conversion."""
     # Hashtag at start of text
@@ -76,6 +199,59 @@ def test_escape_hashtags_at_line_start():
     assert _escape_hashtags("# Heading") == "# Heading"
 
 
+def test_guess_extension_prefers_known_image_types():
+    """Known image media types map to their canonical extension."""
+    assert _guess_extension("image/jpeg") == ".jpg"
+    assert _guess_extension("image/webp") == ".webp"
+    assert _guess_extension("application/x-unknown-type") == ".img"
+
+
+def _jpeg_at(image: Image.Image, quality: int) -> bytes:
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=quality, subsampling=2)
+    return output.getvalue()
+
+
+def test_encode_jpeg_keeps_default_quality_within_budget():
+    """Flat images are encoded once at JPEG_QUALITY."""
+    image = Image.new("RGB", (400, 400), color="blue")
+    assert encode_jpeg(image) == _jpeg_at(image, JPEG_QUALITY)
+
+
+def test_encode_jpeg_keeps_default_quality_for_small_images():
+    """Small images fall under the minimum budget even when busy."""
+    noisy = Image.frombytes("RGB", (64, 64), os.urandom(64 * 64 * 3))
+    assert encode_jpeg(noisy) == _jpeg_at(noisy, JPEG_QUALITY)
+
+
+def test_encode_jpeg_lowers_quality_for_busy_images():
+    """Quality steps down to the floor when the budget can't be met."""
+    noisy = Image.frombytes("RGB", (400, 400), os.urandom(400 * 400 * 3))
+    assert encode_jpeg(noisy) == _jpeg_at(noisy, MIN_JPEG_QUALITY)
+
+
+def test_compress_image_fits_jpeg_within_max_dimension():
+    """Large JPEGs are downscaled to the requested bound and stay JPEG."""
+    output = BytesIO()
+    Image.new("RGB", (3000, 1500), color="blue").save(output, format="JPEG")
+    data, media_type = compress_image(output.getvalue(), 1000)
+
+    assert media_type == "image/jpeg"
+    with Image.open(BytesIO(data)) as img:
+        assert img.size == (1000, 500)
+
+
+def test_compress_image_keeps_transparency_as_png():
+    """Images with an alpha channel are re-encoded as PNG."""
+    output = BytesIO()
+    Image.new("RGBA", (50, 50), color=(0, 0, 255, 128)).save(output, format="PNG")
+    data, media_type = compress_image(output.getvalue(), 1000)
+
+    assert media_type == "image/png"
+    with Image.open(BytesIO(data)) as img:
+        assert img.mode == "RGBA"
+
+
 def test_epub_builder_escapes_hashtags(tmp_path):
     """Hashtags in post body should not become headings in EPUB."""
     post = PostContent(
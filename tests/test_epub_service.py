@@ -1,21 +1,28 @@
 """Tests for the EPUB export service."""
 
+import asyncio
+import os
 from datetime import UTC, datetime
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import AsyncMock
 
+import httpx
 import pytest
 from ebooklib import ITEM_DOCUMENT, epub
 from PIL import Image
 
+from unhook.epub_builder import MIN_JPEG_QUALITY
 from unhook.epub_service import (
+    MAX_CONCURRENT_DOWNLOADS,
+    MAX_IMAGE_DIMENSION,
     _build_repost_info,
     _compress_image,
     _filter_by_length,
     _filter_top_level_posts,
     _get_reposter_handle,
     _is_repost,
+    _map_reposts_to_content,
     download_images,
     export_recent_posts_to_epub,
 )
@@ -36,6 +43,57 @@ async def test_download_images_handles_failures(monkeypatch):
     assert "https://bad.com/b.png" not in result
 
 
+@pytest.mark.asyncio
+async def test_download_images_fetches_duplicate_urls_once(monkeypatch):
+    requested = []
+
+    async def mock_download(client, url):
+        requested.append(url)
+        return None
+
+    monkeypatch.setattr("unhook.epub_service._download_image", mock_download)
+
+    urls = ["https://example.com/a.png", "", "https://example.com/a.png"]
+    await download_images(urls)
+    assert requested == ["https://example.com/a.png"]
+
+
+@pytest.mark.asyncio
+async def test_download_images_runs_downloads_concurrently(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def mock_download(client, url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return None
+
+    monkeypatch.setattr("unhook.epub_service._download_image", mock_download)
+
+    urls = [f"https://example.com/{idx}.png" for idx in range(40)]
+    assert await download_images(urls) == {}
+    assert peak == MAX_CONCURRENT_DOWNLOADS
+
+
+@pytest.mark.asyncio
+async def test_download_images_uses_provided_client(monkeypatch):
+    seen_clients = []
+
+    async def mock_download(client, url):
+        seen_clients.append(client)
+        return None
+
+    monkeypatch.setattr("unhook.epub_service._download_image", mock_download)
+
+    async with httpx.AsyncClient() as client:
+        await download_images(["https://example.com/a.png"], client=client)
+        assert seen_clients == [client]
+        assert not client.is_closed
+
+
 @pytest.mark.asyncio
 async def test_export_recent_posts_to_epub(tmp_path, monkeypatch):
     now = datetime.now(UTC).isoformat().replace("+00:00", "Z")
@@ -67,6 +125,48 @@ async def test_export_recent_posts_to_epub(tmp_path, monkeypatch):
     assert Path(output_path).suffix == ".epub"
 
 
+@pytest.mark.asyncio
+async def test_export_recent_posts_cancels_downloads_when_rendering_fails(
+    tmp_path, monkeypatch
+):
+    now = datetime.now(UTC).isoformat().replace("+00:00", "Z")
+    sample_feed = [
+        {
+            "post": {
+                "uri": "at://did:plc:test/app.bsky.feed.post/1",
+                "author": {"handle": "user.bsky.social"},
+                "record": {"text": "Post body", "created_at": now},
+                "embed": {"images": [{"fullsize": "https://example.com/image.jpg"}]},
+            }
+        }
+    ]
+    cancelled = asyncio.Event()
+
+    async def slow_download(urls, client=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {}
+
+    def failing_render(bodies):
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(
+        "unhook.epub_service.fetch_feed_posts",
+        lambda limit=200, since_days=1: sample_feed,
+    )
+    monkeypatch.setattr("unhook.epub_service.download_images", slow_download)
+    monkeypatch.setattr("unhook.epub_service.render_post_bodies", failing_render)
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        await export_recent_posts_to_epub(tmp_path, min_length=0)
+
+    assert excinfo.group_contains(RuntimeError, match="render failed")
+    assert cancelled.is_set()
+
+
 @pytest.mark.asyncio
 async def test_export_recent_posts_to_epub_consolidates_self_thread(
     tmp_path, monkeypatch
@@ -331,8 +431,8 @@ def test_compress_image_resizes_large_jpeg():
     data, media_type = _compress_image(large_image, "image/jpeg")
 
     with Image.open(BytesIO(data)) as img:
-        assert img.width <= 1200
-        assert img.height <= 1200
+        assert img.width <= MAX_IMAGE_DIMENSION
+        assert img.height <= MAX_IMAGE_DIMENSION
     assert media_type == "image/jpeg"
 
 
@@ -367,6 +467,20 @@ def test_compress_image_converts_opaque_png_to_jpeg():
     assert media_type == "image/jpeg"
 
 
+def test_compress_image_lowers_jpeg_quality_for_busy_images():
+    """It encodes images that can't fit the size budget at the quality floor."""
+    noisy = Image.frombytes("RGB", (400, 400), os.urandom(400 * 400 * 3))
+    source = BytesIO()
+    noisy.save(source, format="PNG")
+    expected = BytesIO()
+    noisy.save(expected, format="JPEG", quality=MIN_JPEG_QUALITY, subsampling=2)
+
+    data, media_type = _compress_image(source.getvalue(), "image/png")
+
+    assert data == expected.getvalue()
+    assert media_type == "image/jpeg"
+
+
 def test_compress_image_converts_webp_to_jpeg():
     """It converts WebP to JPEG for EPUB compatibility."""
     webp_image = _create_test_image(100, 100, "RGB", "WEBP")
@@ -591,6 +705,23 @@ class TestBuildRepostInfo:
         assert result == {}
 
 
+# Tests for _map_reposts_to_content helper
+
+
+class TestMapRepostsToContent:
+    """Tests for _map_reposts_to_content function."""
+
+    def test_attributes_reposts_from_generator_input(self):
+        """It keeps reposter attribution when given a one-shot iterable."""
+        posts = [
+            {"post": {"uri": "at://uri1", "record": {"text": "First"}}},
+            {"post": {"uri": "at://uri2#thread", "record": {"text": "Thread"}}},
+        ]
+        repost_info = {"at://uri1": "alice", "at://uri2": "bob"}
+        result = _map_reposts_to_content((post for post in posts), repost_info)
+        assert [content.reposted_by for content in result] == ["alice", "bob"]
+
+
 # Tests for _filter_top_level_posts helper
 
 
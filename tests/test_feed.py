@@ -1,5 +1,6 @@
 """Test cases for the feed module."""
 
+import json
 from datetime import UTC, datetime, timedelta
 from unittest.mock import MagicMock, patch
 
@@ -15,6 +16,12 @@ from unhook.feed import (
 )
 
 
+@pytest.fixture(autouse=True)
+def no_session_cache(monkeypatch):
+    """Keep tests from reading or writing the real session cache."""
+    monkeypatch.setattr("unhook.feed.SESSION_CACHE_PATH", None)
+
+
 def test_fetch_feed_posts_success(mock_env_vars, sample_timeline_response):
     """It fetches posts successfully with mocked client."""
     with patch("unhook.feed.Client") as mock_client_class:
@@ -77,6 +84,54 @@ def test_fetch_feed_posts_api_error(mock_env_vars):
             fetch_feed_posts()
 
 
+def test_fetch_feed_posts_reuses_cached_session(
+    mock_env_vars, sample_timeline_response, tmp_path, monkeypatch
+):
+    """It logs in with a cached session instead of the password."""
+    cache_path = tmp_path / "session.json"
+    cache_path.write_text(
+        json.dumps({"handle": "test.bsky.social", "session": "cached-session"})
+    )
+    monkeypatch.setattr("unhook.feed.SESSION_CACHE_PATH", cache_path)
+
+    with patch("unhook.feed.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        mock_client.get_timeline.return_value = sample_timeline_response
+        mock_client.export_session_string.return_value = "refreshed-session"
+
+        fetch_feed_posts(limit=100)
+
+        mock_client.login.assert_called_once_with(session_string="cached-session")
+        assert json.loads(cache_path.read_text())["session"] == "refreshed-session"
+
+
+def test_fetch_feed_posts_saves_session_after_password_login(
+    mock_env_vars, sample_timeline_response, tmp_path, monkeypatch
+):
+    """It falls back to the password and caches the new session privately."""
+    cache_path = tmp_path / "session.json"
+    cache_path.write_text(
+        json.dumps({"handle": "other.bsky.social", "session": "not-mine"})
+    )
+    monkeypatch.setattr("unhook.feed.SESSION_CACHE_PATH", cache_path)
+
+    with patch("unhook.feed.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        mock_client.get_timeline.return_value = sample_timeline_response
+        mock_client.export_session_string.return_value = "new-session"
+
+        fetch_feed_posts(limit=100)
+
+        mock_client.login.assert_called_once_with("test.bsky.social", "test-password")
+        assert json.loads(cache_path.read_text()) == {
+            "handle": "test.bsky.social",
+            "session": "new-session",
+        }
+        assert cache_path.stat().st_mode & 0o777 == 0o600
+
+
 def test_parse_timestamp():
     """It parses ISO 8601 timestamps correctly."""
     # Test with Z suffix
@@ -123,6 +178,42 @@ def test_fetch_feed_posts_filters_old_posts(mock_env_vars):
         assert result[0]["post"]["record"]["text"] == "Recent post"
 
 
+def test_fetch_feed_posts_skips_dumping_old_posts(mock_env_vars):
+    """It checks the date on the model before converting it to a dict."""
+    now = datetime.now(UTC)
+    old_item = make_post_mock(
+        1, "Old post", (now - timedelta(days=10)).isoformat().replace("+00:00", "Z")
+    )
+    old_item.model_dump = MagicMock()
+    response = MagicMock(feed=[old_item], cursor=None)
+
+    with patch("unhook.feed.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        mock_client.get_timeline.return_value = response
+
+        assert fetch_feed_posts(limit=100, since_days=7) == []
+        old_item.model_dump.assert_not_called()
+
+
+def test_fetch_feed_posts_filters_records_without_created_at_attribute(
+    mock_env_vars,
+):
+    """It falls back to the dumped record when the model lacks created_at."""
+    now = datetime.now(UTC)
+    old_timestamp = (now - timedelta(days=10)).isoformat().replace("+00:00", "Z")
+    old_item = make_post_mock(1, "Old post", old_timestamp)
+    old_item.post.record = {"created_at": old_timestamp}
+    response = MagicMock(feed=[old_item], cursor=None)
+
+    with patch("unhook.feed.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+        mock_client.get_timeline.return_value = response
+
+        assert fetch_feed_posts(limit=100, since_days=7) == []
+
+
 def test_fetch_feed_posts_no_date_filter(mock_env_vars):
     """It fetches all posts when since_days is None."""
     now = datetime.now(UTC)
@@ -245,6 +336,20 @@ def test_find_self_threads_handles_branches():
     } == thread_uris
 
 
+def test_find_self_threads_stops_at_reply_cycles():
+    """It terminates when reply references form a cycle."""
+
+    first = make_post("at://a", "did:author:1", "A", parent_uri="at://b")
+    second = make_post("at://b", "did:author:1", "B", parent_uri="at://a")
+    leaf = make_post("at://leaf", "did:author:1", "Leaf", parent_uri="at://a")
+
+    threads = find_self_threads([first, second, leaf])
+
+    assert len(threads) == 1
+    uris = [post["post"]["uri"] for post in threads[0]]
+    assert uris == ["at://b", "at://a", "at://leaf"]
+
+
 def test_find_self_threads_ignores_mixed_authors():
     """It ignores replies from different authors when building chains."""
 
@@ -1,18 +1,32 @@
 """Tests for the Gmail EPUB export service."""
 
+import asyncio
+import os
+import time
 from datetime import UTC, datetime
 from io import BytesIO
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from ebooklib import ITEM_DOCUMENT, epub
 from PIL import Image
 
 from unhook.email_content import EmailContent
 from unhook.gmail_epub_service import (
+    CACHE_MAX_AGE_DAYS,
+    MAX_CONCURRENT_DOWNLOADS,
+    PASSTHROUGH_MAX_BYTES,
     EmailEpubBuilder,
+    _cache_write,
     _compress_image,
+    _compress_image_cached,
+    _download_image,
+    _prune_cache,
+    _quantize_png,
     _sanitize_email_html,
+    _sanitize_email_html_cached,
+    _sniff_media_type,
     _strip_email_boilerplate,
     _strip_small_images,
     download_external_images,
@@ -21,6 +35,12 @@ from unhook.gmail_epub_service import (
 from unhook.gmail_service import GmailConfig, RawEmail
 
 
+@pytest.fixture(autouse=True)
+def no_disk_cache(monkeypatch):
+    """Keep tests from reading or writing the real processing cache."""
+    monkeypatch.setattr("unhook.gmail_epub_service.CACHE_DIR", None)
+
+
 def _create_test_image(
     width: int, height: int, mode: str = "RGB", img_format: str = "JPEG"
 ) -> bytes:
@@ -179,6 +199,18 @@ class TestStripEmailBoilerplate:
         result = _strip_email_boilerplate(html)
         assert "actual article content" in result
 
+    def test_strips_only_the_matching_link(self):
+        html = (
+            '<a href="/a">Keep <b>this</b></a> and '
+            '<A href="/b"><span>Unsubscribe</span></A>'
+        )
+        result = _strip_email_boilerplate(html)
+        assert result == '<a href="/a">Keep <b>this</b></a> and '
+
+    def test_keeps_unclosed_link(self):
+        html = '<a href="/a">Unsubscribe <b>' + "text " * 10_000
+        assert _strip_email_boilerplate(html) == html
+
 
 class TestCompressImage:
     """Tests for _compress_image function."""
@@ -212,15 +244,70 @@ class TestCompressImage:
             assert img.format == "PNG"
         assert media_type == "image/png"
 
+    def test_quantize_png_without_pngquant(self, monkeypatch):
+        """It returns the PNG unchanged when pngquant is unavailable."""
+        monkeypatch.setattr("unhook.gmail_epub_service.PNGQUANT_PATH", None)
+        assert _quantize_png(b"png") == b"png"
+
+    def test_quantize_png_keeps_original_on_failure(self, monkeypatch):
+        """It falls back to the original bytes when pngquant exits non-zero."""
+        monkeypatch.setattr("unhook.gmail_epub_service.PNGQUANT_PATH", "pngquant")
+        monkeypatch.setattr(
+            "unhook.gmail_epub_service.subprocess.run",
+            MagicMock(return_value=MagicMock(returncode=98, stdout=b"")),
+        )
+        assert _quantize_png(b"png") == b"png"
+
+    def test_quantize_png_uses_pngquant_output(self, monkeypatch):
+        """It returns pngquant's output when quantization succeeds."""
+        monkeypatch.setattr("unhook.gmail_epub_service.PNGQUANT_PATH", "pngquant")
+        run = MagicMock(return_value=MagicMock(returncode=0, stdout=b"small"))
+        monkeypatch.setattr("unhook.gmail_epub_service.subprocess.run", run)
+
+        assert _quantize_png(b"png") == b"small"
+        assert run.call_args.kwargs["input"] == b"png"
+
     def test_converts_opaque_png_to_jpeg(self):
         """It converts opaque PNG to JPEG."""
-        rgb_png = _create_test_image(100, 100, "RGB", "PNG")
+        # Noise doesn't deflate, keeping the PNG above the passthrough size
+        noisy = Image.frombytes("RGB", (400, 400), os.urandom(400 * 400 * 3))
+        output = BytesIO()
+        noisy.save(output, format="PNG")
+        rgb_png = output.getvalue()
+        assert len(rgb_png) > PASSTHROUGH_MAX_BYTES
+
         data, media_type = _compress_image(rgb_png, "image/png")
 
         with Image.open(BytesIO(data)) as img:
             assert img.format == "JPEG"
         assert media_type == "image/jpeg"
 
+    def test_passes_small_png_through(self):
+        """It embeds small PNGs unchanged instead of re-encoding them."""
+        rgb_png = _create_test_image(100, 100, "RGB", "PNG")
+        data, media_type = _compress_image(rgb_png, "image/jpeg")
+
+        assert data == rgb_png
+        assert media_type == "image/png"
+
+    def test_passes_small_jpeg_through(self):
+        """It embeds small JPEGs unchanged instead of re-encoding them."""
+        jpeg = _create_test_image(800, 600, "RGB", "JPEG")
+        data, media_type = _compress_image(jpeg, None)
+
+        assert data == jpeg
+        assert media_type == "image/jpeg"
+
+    def test_recompresses_cmyk_jpeg(self):
+        """It re-encodes CMYK JPEGs to RGB even when they are small."""
+        cmyk = Image.new("CMYK", (100, 100))
+        output = BytesIO()
+        cmyk.save(output, format="JPEG")
+        data, _ = _compress_image(output.getvalue(), "image/jpeg")
+
+        with Image.open(BytesIO(data)) as img:
+            assert img.mode == "RGB"
+
     def test_converts_tiff_to_jpeg(self):
         """It converts TIFF to JPEG for EPUB compatibility."""
         tiff_image = _create_test_image(100, 100, "RGB", "TIFF")
@@ -230,6 +317,13 @@ class TestCompressImage:
             assert img.format == "JPEG"
         assert media_type == "image/jpeg"
 
+    def test_returns_original_on_truncated_png(self):
+        """It does not trust a PNG header cut off before the dimensions."""
+        truncated = _create_test_image(10, 10, "RGB", "PNG")[:20]
+        data, media_type = _compress_image(truncated, "image/png")
+        assert data == truncated
+        assert media_type == "image/png"
+
     def test_returns_original_on_invalid_data(self):
         """It returns original content for invalid image data."""
         invalid_data = b"not an image"
@@ -238,6 +332,26 @@ class TestCompressImage:
         assert media_type == "image/jpeg"
 
 
+class TestSniffMediaType:
+    """Tests for _sniff_media_type function."""
+
+    @pytest.mark.parametrize(
+        ("img_format", "expected"),
+        [
+            ("PNG", "image/png"),
+            ("JPEG", "image/jpeg"),
+            ("GIF", "image/gif"),
+            ("WEBP", "image/webp"),
+        ],
+    )
+    def test_detects_common_formats(self, img_format, expected):
+        image = _create_test_image(10, 10, "RGB", img_format)
+        assert _sniff_media_type(image) == expected
+
+    def test_returns_none_for_unknown_bytes(self):
+        assert _sniff_media_type(b"not an image") is None
+
+
 @pytest.mark.asyncio
 async def test_download_external_images_success(monkeypatch):
     """It downloads and compresses external images."""
@@ -280,6 +394,80 @@ async def test_download_external_images_deduplicates(monkeypatch):
     assert download_count == 1
 
 
+@pytest.mark.asyncio
+async def test_download_external_images_starts_in_document_order(monkeypatch):
+    """It starts downloads in the order the URLs first appear."""
+    started = []
+
+    async def mock_download(client, url):
+        started.append(url)
+        return None
+
+    monkeypatch.setattr("unhook.gmail_epub_service._download_image", mock_download)
+
+    urls = [f"https://example.com/{idx}.jpg" for idx in range(10)]
+    await download_external_images([*urls, *reversed(urls)])
+
+    assert started == urls
+
+
+@pytest.mark.asyncio
+async def test_download_external_images_runs_concurrently(monkeypatch):
+    """It overlaps downloads up to the concurrency limit."""
+    in_flight = 0
+    peak = 0
+
+    async def mock_download(client, url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return None
+
+    monkeypatch.setattr("unhook.gmail_epub_service._download_image", mock_download)
+
+    urls = [f"https://example.com/{idx}.jpg" for idx in range(40)]
+    assert await download_external_images(urls) == {}
+    assert peak == MAX_CONCURRENT_DOWNLOADS
+
+
+@pytest.mark.asyncio
+async def test_download_image_returns_body():
+    """It returns the streamed response body."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"img"))
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert await _download_image(client, "https://example.com/a.jpg") == b"img"
+
+
+@pytest.mark.asyncio
+async def test_download_image_skips_oversized_body(monkeypatch):
+    """It gives up on responses larger than MAX_IMAGE_BYTES."""
+    monkeypatch.setattr("unhook.gmail_epub_service.MAX_IMAGE_BYTES", 10)
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"x" * 11)
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert await _download_image(client, "https://example.com/a.jpg") is None
+
+
+@pytest.mark.asyncio
+async def test_download_external_images_uses_provided_client(monkeypatch):
+    """It downloads with a caller-provided client and leaves it open."""
+    seen_clients = []
+
+    async def mock_download(client, url):
+        seen_clients.append(client)
+        return None
+
+    monkeypatch.setattr("unhook.gmail_epub_service._download_image", mock_download)
+
+    async with httpx.AsyncClient() as client:
+        await download_external_images(["https://example.com/a.jpg"], client=client)
+        assert seen_clients == [client]
+        assert not client.is_closed
+
+
 @pytest.mark.asyncio
 async def test_download_external_images_empty_list():
     """It handles empty URL list."""
@@ -287,6 +475,91 @@ async def test_download_external_images_empty_list():
     assert result == {}
 
 
+class TestDiskCache:
+    """Tests for the cross-run processing cache."""
+
+    def test_sanitize_reuses_cached_result(self, tmp_path, monkeypatch):
+        """It sanitizes a given HTML body only once across calls."""
+        monkeypatch.setattr("unhook.gmail_epub_service.CACHE_DIR", tmp_path)
+        calls = []
+
+        def fake_sanitize(html):
+            calls.append(html)
+            return "<p>clean</p>"
+
+        monkeypatch.setattr(
+            "unhook.gmail_epub_service._sanitize_email_html", fake_sanitize
+        )
+
+        assert _sanitize_email_html_cached("<p>raw</p>") == "<p>clean</p>"
+        assert _sanitize_email_html_cached("<p>raw</p>") == "<p>clean</p>"
+        assert calls == ["<p>raw</p>"]
+
+    def test_compress_reuses_cached_result(self, tmp_path, monkeypatch):
+        """It returns the cached bytes and media type on a second call."""
+        monkeypatch.setattr("unhook.gmail_epub_service.CACHE_DIR", tmp_path)
+        test_image = _create_test_image(100, 100, "RGB", "PNG")
+
+        first = _compress_image_cached(test_image, "image/png")
+        monkeypatch.setattr(
+            "unhook.gmail_epub_service._compress_image",
+            MagicMock(side_effect=AssertionError("cache miss")),
+        )
+        assert _compress_image_cached(test_image, "image/png") == first
+
+    @pytest.mark.asyncio
+    async def test_download_skips_cached_urls(self, tmp_path, monkeypatch):
+        """It does not download an image fetched on an earlier run."""
+        monkeypatch.setattr("unhook.gmail_epub_service.CACHE_DIR", tmp_path)
+        test_image = _create_test_image(100, 100, "RGB", "JPEG")
+        downloads = []
+
+        async def mock_download(client, url):
+            downloads.append(url)
+            return test_image
+
+        monkeypatch.setattr("unhook.gmail_epub_service._download_image", mock_download)
+
+        urls = ["https://example.com/image.jpg"]
+        first = await download_external_images(urls)
+        second = await download_external_images(urls)
+
+        assert downloads == urls
+        assert second == first
+
+    def test_failed_write_removes_temp_file(self, tmp_path, monkeypatch):
+        """It deletes the temp file when the entry can't be moved into place."""
+        monkeypatch.setattr("unhook.gmail_epub_service.CACHE_DIR", tmp_path)
+        monkeypatch.setattr(
+            "unhook.gmail_epub_service.os.replace",
+            MagicMock(side_effect=OSError("disk full")),
+        )
+
+        _cache_write("html", "key", b"data")
+
+        assert list((tmp_path / "html").iterdir()) == []
+
+    def test_prune_removes_expired_entries_and_old_versions(
+        self, tmp_path, monkeypatch
+    ):
+        """It drops entries past the max age and earlier version directories."""
+        cache_dir = tmp_path / "v5"
+        monkeypatch.setattr("unhook.gmail_epub_service.CACHE_DIR", cache_dir)
+        (tmp_path / "v4" / "img").mkdir(parents=True)
+        (tmp_path / "v4" / "img" / "entry").write_bytes(b"old")
+        (tmp_path / "notes").mkdir()
+        _cache_write("img", "fresh", b"new")
+        _cache_write("img", "stale", b"old")
+        expired = time.time() - (CACHE_MAX_AGE_DAYS + 1) * 24 * 60 * 60
+        os.utime(cache_dir / "img" / "stale", (expired, expired))
+
+        _prune_cache()
+
+        assert not (tmp_path / "v4").exists()
+        assert (tmp_path / "notes").exists()
+        assert [p.name for p in (cache_dir / "img").iterdir()] == ["fresh"]
+
+
 class TestEmailEpubBuilder:
     """Tests for EmailEpubBuilder class."""
 
@@ -370,6 +643,47 @@ class TestEmailEpubBuilder:
         image_items = [i for i in items if i.media_type and "image" in i.media_type]
         assert len(image_items) >= 1
 
+    def test_stores_identical_images_once(self, tmp_path):
+        """It reuses one EPUB item for identical image bytes across emails."""
+        test_image = _create_test_image(100, 100, "RGB", "JPEG")
+        emails = [
+            EmailContent(
+                title=f"Newsletter {idx}",
+                html_body='<img src="cid:logo">',
+                published=datetime.now(UTC),
+                inline_images={"logo": test_image},
+            )
+            for idx in range(3)
+        ]
+        output_path = tmp_path / "test.epub"
+
+        builder = EmailEpubBuilder()
+        result = builder.build(emails, {}, output_path)
+
+        book = epub.read_epub(str(result))
+        items = list(book.get_items())
+        image_items = [i for i in items if i.media_type and "image" in i.media_type]
+        assert len(image_items) == 1
+
+    def test_escapes_chapter_title(self, tmp_path):
+        """It escapes markup characters in the chapter heading."""
+        email = EmailContent(
+            title="Tips & <tricks>",
+            html_body="<p>Body</p>",
+            published=datetime.now(UTC),
+        )
+        output_path = tmp_path / "test.epub"
+
+        builder = EmailEpubBuilder()
+        result = builder.build([email], {}, output_path)
+
+        book = epub.read_epub(str(result))
+        combined = "\n".join(
+            item.get_content().decode()
+            for item in book.get_items_of_type(ITEM_DOCUMENT)
+        )
+        assert "Tips &amp; &lt;tricks&gt;" in combined
+
     def test_strips_unresolved_remote_external_images(self, tmp_path):
         """It removes remote <img> tags when downloads are unavailable."""
         email = EmailContent(
@@ -288,7 +288,7 @@ class TestFetchSingleEmail:
         service._connection = MagicMock()
         service._connection.fetch.return_value = (
             "OK",
-            [(b"1 (UID 42 RFC822 {1000}", raw_bytes), b")"],
+            [(b"1 (UID 42 BODY[] {1000}", raw_bytes), b")"],
         )
 
         result = service._fetch_single_email(b"1")
@@ -444,7 +444,12 @@ class TestFetchEmailsByLabelLoop:
             mock_conn.search.return_value = ("OK", [b"1 2"])
             mock_conn.fetch.return_value = (
                 "OK",
-                [(b"1 (UID 10 RFC822 {1000}", raw_bytes), b")"],
+                [
+                    (b"1 (UID 10 BODY[] {1000}", raw_bytes),
+                    b")",
+                    (b"2 (UID 11 BODY[] {1000}", raw_bytes),
+                    b")",
+                ],
             )
             mock_imap.return_value = mock_conn
 
@@ -453,6 +458,53 @@ class TestFetchEmailsByLabelLoop:
 
             assert len(result) == 2
             assert all(isinstance(r, RawEmail) for r in result)
+            assert [r.uid for r in result] == ["10", "11"]
+            mock_conn.fetch.assert_called_once_with(b"1,2", "(UID BODY.PEEK[])")
+
+    def test_fetch_emails_batches_fetch_commands(self, gmail_config):
+        """It issues one FETCH per batch of message IDs."""
+        message_ids = b" ".join(str(i).encode() for i in range(1, 121))
+
+        with patch("unhook.gmail_service.imaplib.IMAP4_SSL") as mock_imap:
+            mock_conn = MagicMock()
+            mock_conn.select.return_value = ("OK", [b"1"])
+            mock_conn.search.return_value = ("OK", [message_ids])
+            mock_conn.fetch.return_value = ("OK", [])
+            mock_imap.return_value = mock_conn
+
+            with GmailService(gmail_config) as service:
+                service.fetch_emails_by_label(since_days=7)
+
+        batches = [c.args[0].split(b",") for c in mock_conn.fetch.call_args_list]
+        assert sorted(len(b) for b in batches) == [20, 50, 50]
+
+    def test_fetch_emails_spreads_batches_over_connections(self, gmail_config):
+        """It fetches batches over extra connections and closes them afterwards."""
+        message_ids = b" ".join(str(i).encode() for i in range(1, 121))
+        mime_msg = _build_mime_email(html_body="<p>Newsletter</p>")
+        raw_bytes = mime_msg.as_bytes()
+
+        def fetch(message_set, _parts):
+            data = []
+            for msg_id in message_set.split(b","):
+                data.append((b"%s (UID %s BODY[] {1000}" % (msg_id, msg_id), raw_bytes))
+                data.append(b")")
+            return "OK", data
+
+        with patch("unhook.gmail_service.imaplib.IMAP4_SSL") as mock_imap:
+            mock_conn = MagicMock()
+            mock_conn.select.return_value = ("OK", [b"1"])
+            mock_conn.search.return_value = ("OK", [message_ids])
+            mock_conn.fetch.side_effect = fetch
+            mock_imap.return_value = mock_conn
+
+            with GmailService(gmail_config) as service:
+                result = service.fetch_emails_by_label(since_days=7)
+
+        assert [r.uid for r in result] == [str(i) for i in range(1, 121)]
+        # One connection per batch (3), every one of them logged out
+        assert mock_imap.call_count == 3
+        assert mock_conn.logout.call_count == 3
 
     def test_fetch_emails_skips_failed_messages(self, gmail_config):
         """It continues past individual email fetch failures."""
@@ -463,10 +515,11 @@ class TestFetchEmailsByLabelLoop:
             mock_conn = MagicMock()
             mock_conn.select.return_value = ("OK", [b"1"])
             mock_conn.search.return_value = ("OK", [b"1 2"])
-            # First fetch raises, second succeeds
+            # Batch fetch raises, then the first message fails on its own
             mock_conn.fetch.side_effect = [
                 Exception("IMAP error"),
-                ("OK", [(b"2 (UID 20 RFC822 {500}", raw_bytes), b")"]),
+                Exception("IMAP error"),
+                ("OK", [(b"2 (UID 20 BODY[] {500}", raw_bytes), b")"]),
             ]
             mock_imap.return_value = mock_conn
 
@@ -475,6 +528,28 @@ class TestFetchEmailsByLabelLoop:
 
             assert len(result) == 1
 
+    def test_fetch_emails_retries_rejected_batch(self, gmail_config):
+        """It retries message by message when the batch FETCH is refused."""
+        mime_msg = _build_mime_email(html_body="<p>Good</p>")
+        raw_bytes = mime_msg.as_bytes()
+
+        with patch("unhook.gmail_service.imaplib.IMAP4_SSL") as mock_imap:
+            mock_conn = MagicMock()
+            mock_conn.select.return_value = ("OK", [b"1"])
+            mock_conn.search.return_value = ("OK", [b"1 2"])
+            mock_conn.fetch.side_effect = [
+                ("NO", [b"FETCH failed"]),
+                ("NO", [b"FETCH failed"]),
+                ("OK", [(b"2 (UID 20 BODY[] {500}", raw_bytes), b")"]),
+            ]
+            mock_imap.return_value = mock_conn
+
+            with GmailService(gmail_config) as service:
+                result = service.fetch_emails_by_label(since_days=7)
+
+            assert [r.uid for r in result] == ["20"]
+            assert mock_conn.fetch.call_count == 3
+
     def test_fetch_emails_skips_none_results(self, gmail_config):
         """It skips emails that parse to None."""
         with patch("unhook.gmail_service.imaplib.IMAP4_SSL") as mock_imap:
@@ -11,7 +11,9 @@ from unhook.post_content import (
     _extract_quote_content,
     _extract_record_view,
     _is_view_record,
+    dedupe_and_map,
     dedupe_posts,
+    iter_posts_to_content,
     map_posts_to_content,
 )
 
@@ -397,6 +399,63 @@ class TestApplyLinkFacets:
         result = _apply_link_facets(text, facets)
         assert "[link1](http://link.com)" in result
 
+    def test_applies_link_starting_at_byte_zero(self):
+        """It treats a camelCase byteStart of 0 as a valid offset."""
+        text = "example.com is neat"
+        facets = [
+            {
+                "index": {"byteStart": 0, "byteEnd": 11},
+                "features": [
+                    {"$type": "app.bsky.richtext.facet#link", "uri": "https://e.com"}
+                ],
+            }
+        ]
+        assert _apply_link_facets(text, facets) == "[link1](https://e.com) is neat"
+
+    def test_returns_same_object_without_link_facets(self):
+        """It returns the input unchanged when no facet is a link."""
+        text = "Hi @alice.bsky.social ✨"
+        facets = [
+            {
+                "index": {"byteStart": 3, "byteEnd": 21},
+                "features": [
+                    {"$type": "app.bsky.richtext.facet#mention", "did": "did:plc:a"}
+                ],
+            }
+        ]
+        assert _apply_link_facets(text, facets) is text
+
+    def test_uses_byte_offsets_after_multibyte_characters(self):
+        """It maps facet byte offsets correctly past non-ASCII text."""
+        text = "café example.com"
+        facets = [
+            {
+                # "café " is 6 bytes in UTF-8 but 5 characters
+                "index": {"byteStart": 6, "byteEnd": 17},
+                "features": [
+                    {"$type": "app.bsky.richtext.facet#link", "uri": "https://e.com"}
+                ],
+            }
+        ]
+        assert _apply_link_facets(text, facets) == "café [link1](https://e.com)"
+
+    def test_keeps_first_of_overlapping_links(self):
+        """It drops a link whose range overlaps an earlier one."""
+        text = "see example.com now"
+        link = "app.bsky.richtext.facet#link"
+        facets = [
+            {
+                "index": {"byteStart": 8, "byteEnd": 15},
+                "features": [{"$type": link, "uri": "https://b.com"}],
+            },
+            {
+                "index": {"byteStart": 4, "byteEnd": 15},
+                "features": [{"$type": link, "uri": "https://a.com"}],
+            },
+        ]
+        result = _apply_link_facets(text, facets)
+        assert result == "see [link1](https://a.com) now"
+
 
 # Tests for _extract_image_urls edge cases
 
@@ -641,6 +700,17 @@ class TestDedupePostsEdgeCases:
         """It handles empty input list."""
         assert dedupe_posts([]) == []
 
+    def test_skips_items_without_post_payload(self):
+        """It skips feed items whose post payload is missing or empty."""
+        posts = [
+            {},
+            {"post": None},
+            {"post": {}},
+            {"post": {"uri": "at://valid", "record": {"text": "Has URI"}}},
+        ]
+        result = dedupe_posts(posts)
+        assert [p["post"]["uri"] for p in result] == ["at://valid"]
+
     def test_preserves_order_after_deduplication(self):
         """It preserves original order after removing duplicates."""
         posts = [
@@ -654,6 +724,50 @@ class TestDedupePostsEdgeCases:
         assert [p["post"]["uri"] for p in result] == ["at://1", "at://2", "at://3"]
 
 
+class TestIterPostsToContent:
+    """Tests for iter_posts_to_content."""
+
+    def test_builds_content_lazily(self):
+        """It only converts posts as they are consumed."""
+        consumed = []
+
+        def posts():
+            for text in ("First", "Second"):
+                consumed.append(text)
+                yield {"post": {"uri": f"at://{text}", "record": {"text": text}}}
+
+        stream = iter_posts_to_content(posts())
+        assert consumed == []
+        assert next(stream).body == "First"
+        assert consumed == ["First"]
+        assert [c.body for c in stream] == ["Second"]
+
+
+class TestDedupeAndMap:
+    """Tests for dedupe_and_map."""
+
+    def test_matches_dedupe_then_map(self):
+        """It returns the same content as deduping and then mapping."""
+        posts = [
+            {"post": {"uri": "at://1", "record": {"text": "First"}}},
+            {"post": {"record": {"text": "No URI"}}},
+            {"post": {"uri": "at://2", "record": {"text": "Second"}}},
+            {"post": {"uri": "at://1", "record": {"text": "Duplicate of First"}}},
+        ]
+        result = dedupe_and_map(posts)
+
+        assert [c.body for c in result] == ["First", "Second"]
+        expected = map_posts_to_content(dedupe_posts(posts))
+        assert [(c.title, c.author, c.body) for c in result] == [
+            (c.title, c.author, c.body) for c in expected
+        ]
+
+    def test_accepts_generator(self):
+        """It consumes a one-shot iterable."""
+        posts = ({"post": {"uri": f"at://{i}", "record": {"text": "x"}}} for i in "ab")
+        assert len(dedupe_and_map(posts)) == 2
+
+
 # Tests for map_posts_to_content edge cases
 
 